@@ -14,6 +14,11 @@ class Settings:
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")  # Service role key
     SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    # Optional direct Postgres connection string; lets the worker LISTEN for
+    # new clips instead of relying on polling alone
+    SUPABASE_DB_URL: str = os.getenv("SUPABASE_DB_URL", "")
+    # Per-process cap on pooled HTTP connections to Supabase (services/database.py)
+    SUPABASE_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
     
     # LLM & TTS settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -24,8 +29,21 @@ class Settings:
     DEFAULT_LLM_PROVIDER: str = os.getenv("DEFAULT_LLM_PROVIDER", "openai")
     DEFAULT_LLM_MODEL: str = os.getenv("DEFAULT_LLM_MODEL", "gpt-4o-mini")
     
+    # Worker settings: clips processed concurrently by worker.py. Each clip
+    # also fans TTS out over up to 4 requests, so keep this within the
+    # ElevenLabs plan's concurrency limit
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "4"))
+    # Port for the worker's Prometheus /metrics endpoint; 0 disables it
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "9108"))
+    # Minutes without a heartbeat before a "processing" clip is assumed
+    # orphaned and requeued (migrations/013). Keep well above the longest
+    # pipeline run; a live worker refreshes the heartbeat every minute
+    WORKER_STALE_CLIP_MINUTES: int = int(os.getenv("WORKER_STALE_CLIP_MINUTES", "30"))
+    
     # App settings
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    # Trust DB rows on the response path; DEBUG always validates
+    SKIP_RESPONSE_VALIDATION: bool = os.getenv("SKIP_RESPONSE_VALIDATION", "true").lower() == "true"
 
 
 @lru_cache()
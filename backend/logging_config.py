@@ -0,0 +1,39 @@
+"""
+Logging setup shared by the API and the background worker.
+
+Handlers on the root logger only enqueue records; a QueueListener thread
+does the formatting and the write to stderr, so request handlers and
+worker threads never block on log I/O.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from config import get_settings
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route the root logger through a queue (idempotent).
+    Level is DEBUG when settings.DEBUG is on, INFO otherwise.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if get_settings().DEBUG else logging.INFO)
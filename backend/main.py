@@ -1,45 +1,78 @@
 """
 Main application entry point with route registration.
 """
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException
 from routes.clips import router as clips_router
 from routes.playback import router as playback_router
 from config import get_settings
+from services.database import close_supabase_client, warm_supabase_client, SUPABASE_POOL_SIZE
+from serialization import ORJSONResponse, http_exception_handler, validation_exception_handler
+from middleware import AllowAllCORSMiddleware
+from logging_config import setup_logging
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Size the to_thread executor to the Supabase pool and pre-open a
+    connection on startup; release pooled connections on shutdown.
+    """
+    # supabase-py is sync, so routes await its calls via asyncio.to_thread;
+    # the default executor (cpu_count + 4 workers) would cap in-flight queries
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=SUPABASE_POOL_SIZE, thread_name_prefix="supabase")
+    )
+    await asyncio.to_thread(warm_supabase_client)
+    yield
+    close_supabase_client()
+
 
 # Initialize app
 app = FastAPI(
     title="echo",
     description="delivering information back to you.",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Error bodies (401/404/422) go through orjson like every other response
+app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
 # CORS middleware for extension and web app
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Allows any origin; swap for Starlette's CORSMiddleware to restrict in production
+app.add_middleware(AllowAllCORSMiddleware)
 
 # Register routes
 app.include_router(clips_router, prefix="/api/v1")
 app.include_router(playback_router, prefix="/api/v1")
 
-#
+# Static bodies, rendered once since settings don't change at runtime
+_settings = get_settings()
+_ROOT_BODY = orjson.dumps({"status": "ok", "service": "echo-api"})
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "supabase_configured": bool(_settings.SUPABASE_URL),
+    "debug": _settings.DEBUG
+})
+
+
 @app.get("/")
-def root():
+async def root():
     """Health check endpoint."""
-    return {"status": "ok", "service": "echo-api"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Detailed health check for monitoring."""
-    settings = get_settings()
-    return {
-        "status": "healthy",
-        "supabase_configured": bool(settings.SUPABASE_URL),
-        "debug": settings.DEBUG
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
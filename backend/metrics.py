@@ -0,0 +1,49 @@
+"""
+Prometheus metrics for the background worker.
+
+Metrics are always recorded in-process; they're only exposed over HTTP once
+start_metrics_server() runs (worker.py, port from WORKER_METRICS_PORT).
+"""
+import logging
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+PENDING_CLIPS = Gauge(
+    "worker_pending_clips",
+    "Clips waiting to be claimed, as of the last poll"
+)
+INFLIGHT_CLIPS = Gauge(
+    "worker_inflight_clips",
+    "Clips currently being processed by this worker"
+)
+# Clip created -> claimed by a worker
+DISPATCH_LATENCY = Histogram(
+    "worker_dispatch_latency_seconds",
+    "Time from clip creation until a worker claims it",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+)
+# Whole pipeline: scrape/note -> script -> TTS -> upload -> status update
+PROCESS_DURATION = Histogram(
+    "worker_process_duration_seconds",
+    "Time spent in process_clip",
+    ["outcome"],
+    buckets=(5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+)
+POLL_ERRORS = Counter(
+    "worker_db_poll_errors_total",
+    "Failed worker loop iterations (claim / poll errors)"
+)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics on `port` from a daemon thread; 0 disables it."""
+    if not port:
+        return
+    try:
+        start_http_server(port)
+    except OSError as e:
+        # e.g. a second worker on the same host; metrics are still recorded
+        logger.warning("Metrics server not started on port %d: %s", port, e)
+        return
+    logger.info("Serving metrics on :%d/metrics", port)
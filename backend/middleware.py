@@ -0,0 +1,63 @@
+"""
+Pure-ASGI middleware.
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+
+class AllowAllCORSMiddleware:
+    """
+    CORS for an allow-any-origin policy (with credentials).
+
+    Equivalent to Starlette's CORSMiddleware with "*" for origins, methods
+    and headers, but with nothing to match per request: the Origin is echoed
+    back, preflights are answered directly, and requests without an Origin
+    header pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+        
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+        
+        # Preflight: answer without touching the app
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = cors_headers + [
+                (b"access-control-allow-methods", _ALLOW_METHODS),
+                (b"access-control-max-age", b"600"),
+            ]
+            if request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *cors_headers]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
@@ -0,0 +1,22 @@
+-- Seed a zero playback_progress row for every new clip.
+-- Runs inside the clip INSERT, so create_clip needs a single round-trip
+-- and the frontend still sees 0% progress instead of null.
+
+create or replace function public.init_playback_progress()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.playback_progress (user_id, clip_id, position_seconds, has_completed)
+    values (new.user_id, new.id, 0, false)
+    on conflict (user_id, clip_id) do nothing;
+    return new;
+end;
+$$;
+
+drop trigger if exists audio_clips_init_playback_progress on public.audio_clips;
+create trigger audio_clips_init_playback_progress
+    after insert on public.audio_clips
+    for each row execute function public.init_playback_progress();
@@ -0,0 +1,13 @@
+-- Flip is_favorited in a single statement and return the updated row.
+-- Replaces the SELECT + UPDATE pair in toggle_favorite (one round-trip,
+-- no read-modify-write race). Returns no rows if the clip isn't the user's.
+
+create or replace function public.toggle_clip_favorite(p_clip_id uuid, p_user_id uuid)
+returns setof public.audio_clips
+language sql
+as $$
+    update public.audio_clips
+    set is_favorited = not is_favorited
+    where id = p_clip_id and user_id = p_user_id
+    returning *;
+$$;
@@ -0,0 +1,5 @@
+-- Serve list_clips (user_id = ? ORDER BY created_at DESC, optional status
+-- filter, LIMIT/OFFSET) from an index instead of a scan + sort.
+
+create index if not exists audio_clips_user_created_status_idx
+    on public.audio_clips (user_id, created_at desc, status);
@@ -0,0 +1,19 @@
+-- Stamp status transition times in the database instead of sending
+-- client-side timestamps from the worker.
+
+create or replace function public.stamp_clip_status_times()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.status is distinct from old.status and new.status = 'processing' then
+        new.started_processing_at := now();
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists audio_clips_stamp_status_times on public.audio_clips;
+create trigger audio_clips_stamp_status_times
+    before update of status on public.audio_clips
+    for each row execute function public.stamp_clip_status_times();
@@ -0,0 +1,22 @@
+-- Upsert playback progress only if the clip belongs to the user.
+-- Folds the ownership SELECT into the write, so update_progress is a single
+-- round-trip. Returns no rows if the clip isn't the user's.
+
+create or replace function public.upsert_playback_progress(
+    p_clip_id uuid,
+    p_user_id uuid,
+    p_position_seconds integer,
+    p_has_completed boolean
+)
+returns setof public.playback_progress
+language sql
+as $$
+    insert into public.playback_progress (user_id, clip_id, position_seconds, has_completed)
+    select c.user_id, c.id, p_position_seconds, p_has_completed
+    from public.audio_clips c
+    where c.id = p_clip_id and c.user_id = p_user_id
+    on conflict (user_id, clip_id) do update
+    set position_seconds = excluded.position_seconds,
+        has_completed = excluded.has_completed
+    returning *;
+$$;
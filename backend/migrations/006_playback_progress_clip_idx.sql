@@ -0,0 +1,7 @@
+-- The (user_id, clip_id) unique key can't serve lookups by clip_id alone,
+-- which is how the audio_clips -> playback_progress FK is checked: every
+-- delete_clip cascade (and the embed in get_progress) would otherwise scan
+-- playback_progress.
+
+create index if not exists playback_progress_clip_id_idx
+    on public.playback_progress (clip_id);
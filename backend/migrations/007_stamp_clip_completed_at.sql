@@ -0,0 +1,18 @@
+-- Extend the status trigger from migrations/004 to also stamp completed_at,
+-- so update_clip_status_node no longer sends a worker-side timestamp.
+
+create or replace function public.stamp_clip_status_times()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.status is distinct from old.status then
+        if new.status = 'processing' then
+            new.started_processing_at := now();
+        elsif new.status = 'completed' then
+            new.completed_at := now();
+        end if;
+    end if;
+    return new;
+end;
+$$;
@@ -0,0 +1,21 @@
+-- Push a notification when a clip becomes pending so the worker can wake
+-- immediately instead of waiting out its poll interval (worker.py, which
+-- LISTENs on clips_pending when SUPABASE_DB_URL is set). The payload is
+-- the clip id; the worker only uses it as a wake-up signal.
+
+create or replace function public.notify_pending_clip()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.status = 'pending' then
+        perform pg_notify('clips_pending', new.id::text);
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists audio_clips_notify_pending on public.audio_clips;
+create trigger audio_clips_notify_pending
+    after insert or update of status on public.audio_clips
+    for each row execute function public.notify_pending_clip();
@@ -0,0 +1,38 @@
+-- Atomically claim the oldest pending clips for a worker. Rows are flipped
+-- to 'processing' in the same statement that selects them, and SKIP LOCKED
+-- lets concurrent workers claim disjoint batches instead of blocking on or
+-- double-processing each other's rows. started_processing_at is stamped by
+-- audio_clips_stamp_status_times (migrations/004).
+
+create or replace function public.claim_pending_clips(p_limit int)
+returns setof public.audio_clips
+language sql
+as $$
+    update public.audio_clips
+    set status = 'processing'
+    where id in (
+        select id
+        from public.audio_clips
+        where status = 'pending'
+        order by created_at
+        limit p_limit
+        for update skip locked
+    )
+    returning *;
+$$;
+
+-- Put clips whose worker died mid-run back in the queue. The worker calls
+-- this on startup; it can also be scheduled, e.g. with pg_cron:
+--   select cron.schedule('requeue-stale-clips', '*/5 * * * *',
+--                        'select public.requeue_stale_clips(15)');
+
+create or replace function public.requeue_stale_clips(p_timeout_minutes int)
+returns setof public.audio_clips
+language sql
+as $$
+    update public.audio_clips
+    set status = 'pending'
+    where status = 'processing'
+      and started_processing_at < now() - make_interval(mins => p_timeout_minutes)
+    returning *;
+$$;
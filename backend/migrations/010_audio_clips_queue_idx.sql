@@ -0,0 +1,12 @@
+-- The worker's claim (claim_pending_clips, migrations/009) looks for the
+-- oldest pending rows; a partial index holds only the pending set, so the
+-- lookup is a short ordered range scan however many completed clips the
+-- table accumulates. Same for the stale-claim sweep over processing rows.
+
+create index if not exists audio_clips_pending_created_idx
+    on public.audio_clips (created_at)
+    where status = 'pending';
+
+create index if not exists audio_clips_processing_started_idx
+    on public.audio_clips (started_processing_at)
+    where status = 'processing';
@@ -0,0 +1,16 @@
+-- claim_pending_clips plus the remaining queue depth in one round-trip, so
+-- the worker's pending-clips metric doesn't cost a second query per poll.
+-- The count sees the snapshot from before the claim, hence the subtraction.
+
+create or replace function public.claim_pending_clips_with_depth(p_limit int)
+returns table (claimed jsonb, pending_depth bigint)
+language sql
+as $$
+    with claimed as (
+        select * from public.claim_pending_clips(p_limit)
+    )
+    select
+        coalesce((select jsonb_agg(c) from claimed c), '[]'::jsonb),
+        (select count(*) from public.audio_clips where status = 'pending')
+            - (select count(*) from claimed);
+$$;
@@ -0,0 +1,29 @@
+-- Return only the columns the worker reads from each claimed clip, instead
+-- of whole rows (generated_script, audio_url, ... are always empty or
+-- irrelevant at claim time). Keep in sync with worker.CLAIM_COLUMNS.
+
+create or replace function public.claim_pending_clips_with_depth(p_limit int)
+returns table (claimed jsonb, pending_depth bigint)
+language sql
+as $$
+    with claimed as (
+        select * from public.claim_pending_clips(p_limit)
+    )
+    select
+        coalesce(
+            (
+                select jsonb_agg(jsonb_build_object(
+                    'id', c.id,
+                    'created_at', c.created_at,
+                    'input_type', c.input_type,
+                    'input_content', c.input_content,
+                    'target_duration', c.target_duration,
+                    'context_instruction', c.context_instruction
+                ))
+                from claimed c
+            ),
+            '[]'::jsonb
+        ),
+        (select count(*) from public.audio_clips where status = 'pending')
+            - (select count(*) from claimed);
+$$;
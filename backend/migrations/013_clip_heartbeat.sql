@@ -0,0 +1,63 @@
+-- Detect orphaned clips by a worker heartbeat instead of by how long they've
+-- been processing. requeue_stale_clips (migrations/009) used the age of
+-- started_processing_at alone, so a clip that legitimately ran past the
+-- timeout was requeued and processed twice, even while its worker was still
+-- on it (and any replica's startup sweep did this to every other replica).
+--
+-- Claiming stamps heartbeat_at alongside started_processing_at; the worker
+-- then refreshes it for its in-flight clips (heartbeat_clips), and only rows
+-- whose heartbeat has lapsed, or that never had one, are requeued.
+
+alter table public.audio_clips
+    add column if not exists heartbeat_at timestamptz;
+
+-- Clips already processing when this runs keep their original start time as
+-- their last sign of life instead of all being requeued at once
+update public.audio_clips
+set heartbeat_at = started_processing_at
+where status = 'processing' and heartbeat_at is null;
+
+create or replace function public.stamp_clip_status_times()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.status is distinct from old.status and new.status = 'processing' then
+        new.started_processing_at := now();
+        new.heartbeat_at := now();
+    end if;
+    return new;
+end;
+$$;
+
+create or replace function public.heartbeat_clips(p_clip_ids uuid[])
+returns void
+language sql
+as $$
+    update public.audio_clips
+    set heartbeat_at = now()
+    where id = any(p_clip_ids) and status = 'processing';
+$$;
+
+-- A processing row with no heartbeat (e.g. started_processing_at was never
+-- stamped) has no owner that could finish it, so it counts as stale
+create or replace function public.requeue_stale_clips(p_timeout_minutes int)
+returns setof public.audio_clips
+language sql
+as $$
+    update public.audio_clips
+    set status = 'pending'
+    where status = 'processing'
+      and (
+          heartbeat_at is null
+          or heartbeat_at < now() - make_interval(mins => p_timeout_minutes)
+      )
+    returning *;
+$$;
+
+-- The sweep now filters on heartbeat_at (replaces the migrations/010 index)
+create index if not exists audio_clips_processing_heartbeat_idx
+    on public.audio_clips (heartbeat_at)
+    where status = 'processing';
+
+drop index if exists public.audio_clips_processing_started_idx;
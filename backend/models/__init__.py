@@ -1,11 +1,17 @@
 """Pydantic models for request/response validation."""
 from models.requests import CreateClipRequest, UpdateProgressRequest
-from models.responses import ClipResponse, PlaybackProgressResponse, ClipsListResponse
+from models.responses import (
+    ClipResponse,
+    ClipListItemResponse,
+    PlaybackProgressResponse,
+    ClipsListResponse,
+)
 
 __all__ = [
     "CreateClipRequest",
     "UpdateProgressRequest", 
     "ClipResponse",
+    "ClipListItemResponse",
     "PlaybackProgressResponse",
     "ClipsListResponse",
 ]
@@ -2,7 +2,7 @@
 Request DTOs for API endpoints.
 """
 from typing import Optional, Literal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field
 # for incoming requests (client -> server)
 # validate incoming request bodies, make sure clients send valid data
 # runs before the route handler is called
@@ -10,6 +10,8 @@ from pydantic import BaseModel, Field, field_validator
 class CreateClipRequest(BaseModel):
     """Request body for creating a new audio clip."""
     
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+    
     input_type: Literal["url", "note"] = Field(
         description="Type of input: 'url' for web pages, 'note' for raw text"
     )
@@ -26,18 +28,13 @@ class CreateClipRequest(BaseModel):
         max_length=500,
         description="Optional instruction (e.g., 'Focus on financial aspects')"
     )
-    
-    @field_validator("input_content")
-    @classmethod
-    def validate_content(cls, v: str, info) -> str:
-        """Ensure URL inputs look like URLs."""
-        # Access input_type from the data being validated
-        return v.strip()
 
 
 class UpdateProgressRequest(BaseModel):
     """Request body for updating playback progress."""
     
+    model_config = ConfigDict(extra="ignore")
+    
     position_seconds: int = Field(
         ge=0,
         description="Current playback position in seconds"
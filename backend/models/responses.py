@@ -3,13 +3,17 @@ Response DTOs for API endpoints.
 """
 from typing import Optional, List, Literal
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 # for outgoing responses (server -> client)
 # structure outgoing response bodies, ensure clientsreceive consistent, documented data
 # runs after the route handler is called
 
-class ClipResponse(BaseModel):
-    """Single audio clip response."""
+class ClipListItemResponse(BaseModel):
+    """Audio clip as shown in lists (no generated script)."""
+    
+    # DB rows carry columns we don't expose (user_id, ...); drop them.
+    # Frozen: responses are built once and never mutated
+    model_config = ConfigDict(extra="ignore", validate_assignment=False, frozen=True)
     
     id: str
     input_type: Literal["url", "note"]
@@ -18,7 +22,6 @@ class ClipResponse(BaseModel):
     page_title: Optional[str] = None
     target_duration: int
     status: Literal["pending", "processing", "completed", "failed"]
-    generated_script: Optional[str] = None
     audio_url: Optional[str] = None
     actual_duration: Optional[int] = None  # seconds
     error_message: Optional[str] = None
@@ -28,16 +31,24 @@ class ClipResponse(BaseModel):
     completed_at: Optional[datetime] = None
 
 
+class ClipResponse(ClipListItemResponse):
+    """Single audio clip response."""
+    
+    generated_script: Optional[str] = None
+
+
 class ClipsListResponse(BaseModel):
     """Paginated list of clips."""
     
-    clips: List[ClipResponse]
+    clips: List[ClipListItemResponse]
     total: int
 
 
 class PlaybackProgressResponse(BaseModel):
     """Playback progress for a clip."""
     
+    model_config = ConfigDict(frozen=True)
+    
     clip_id: str
     position_seconds: int = 0
     has_completed: bool = False
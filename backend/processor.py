@@ -7,18 +7,28 @@ It's called by the background worker and handles:
 - Invoking the processing graph
 - Error handling and status updates
 """
-from datetime import datetime
+import logging
+from typing import Optional
 from services.graph.graph import processing_graph
+from services.graph.nodes import discard_audio_file
 from services.graph.state import ProcessingState
 from services.database import get_supabase_client
 
+logger = logging.getLogger(__name__)
 
-def process_clip(clip_id: str) -> dict:
+# Only the inputs the graph needs; skips generated_script, audio_url, etc.
+_INPUT_COLUMNS = "input_type,input_content,target_duration,context_instruction"
+
+
+def process_clip(clip_id: str, clip: Optional[dict] = None) -> dict:
     """
     Process a single clip through the entire pipeline.
     
     Args:
         clip_id: The database ID of the clip to process
+        clip: The clip row, if the caller already has it. The worker passes
+              the row returned by claim_pending_clips, which is already
+              marked processing, so no fetch or status update is needed
         
     Returns:
         dict with processing results and status
@@ -26,19 +36,20 @@ def process_clip(clip_id: str) -> dict:
     supabase = get_supabase_client()
     
     try:
-        # Fetch clip from database
-        result = supabase.table("audio_clips").select("*").eq("id", clip_id).single().execute()
-        
-        if not result.data:
-            return {"success": False, "error": "Clip not found"}
-        
-        clip = result.data
-        
-        # Update status to processing and set started_processing_at timestamp
-        supabase.table("audio_clips").update({
-            "status": "processing",
-            "started_processing_at": datetime.utcnow().isoformat()
-        }).eq("id", clip_id).execute()
+        if clip is None:
+            # Fetch clip from database
+            result = supabase.table("audio_clips").select(_INPUT_COLUMNS).eq("id", clip_id).single().execute()
+            
+            if not result.data:
+                return {"success": False, "error": "Clip not found"}
+            
+            clip = result.data
+            
+            # Update status to processing (started_processing_at is stamped
+            # by the audio_clips_stamp_status_times trigger, migrations/004)
+            supabase.table("audio_clips").update({
+                "status": "processing"
+            }).eq("id", clip_id).execute()
         
         # Create initial state
         initial_state = ProcessingState(
@@ -49,9 +60,18 @@ def process_clip(clip_id: str) -> dict:
             context_instruction=clip.get("context_instruction")
         )
         
-        # Run the graph
-        print(f"[PROCESSOR] Starting processing for clip {clip_id}")
-        final_state = processing_graph.invoke(initial_state.dict())
+        # Run the graph. Streamed rather than invoked so the last state seen
+        # is known if a node raises: save_audio_node normally removes the
+        # spooled audio, but not if the graph fails before reaching it
+        logger.info("Starting processing for clip %s", clip_id)
+        final_state = {}
+        try:
+            for final_state in processing_graph.stream(initial_state.model_dump(), stream_mode="values"):
+                pass
+        except BaseException:
+            if audio_path := final_state.get("audio_path"):
+                discard_audio_file(audio_path)
+            raise
         
         # Check for errors
         if final_state.get("error"):
@@ -61,11 +81,11 @@ def process_clip(clip_id: str) -> dict:
             }).eq("id", clip_id).execute()
             return {"success": False, "error": final_state["error"]}
         
-        print(f"[PROCESSOR] Completed processing for clip {clip_id}")
+        logger.info("Completed processing for clip %s", clip_id)
         return {"success": True, "state": final_state}
         
     except Exception as e:
-        print(f"[ERROR] Processing failed for clip {clip_id}: {e}")
+        logger.exception("Processing failed for clip %s", clip_id)
         supabase.table("audio_clips").update({
             "status": "failed",
             "error_message": str(e)
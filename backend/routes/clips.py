@@ -1,36 +1,84 @@
 """
 Audio clips CRUD endpoints.
+
+supabase-py is synchronous, so every .execute() runs via asyncio.to_thread
+to keep the event loop free for other requests.
 """
+import asyncio
+import logging
+from datetime import datetime
 from typing import Annotated, Optional, Literal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from pydantic import TypeAdapter
 from services.auth import get_current_user, AuthenticatedUser
-from services.database import get_supabase_client
+from supabase import Client
+from services.database import get_db
 from models.requests import CreateClipRequest
-from models.responses import ClipResponse, ClipsListResponse, MessageResponse
+from models.responses import ClipResponse, ClipListItemResponse, ClipsListResponse, MessageResponse
+from serialization import ORJSONResponse, json_body, json_body_openapi
+from config import get_settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/clips", tags=["clips"])
 
+# List rows skip generated_script, which can be several KB per clip
+_LIST_COLUMNS = ",".join(ClipListItemResponse.model_fields)
+# Single-clip reads fetch exactly what ClipResponse exposes (not user_id, ...)
+_CLIP_COLUMNS = ",".join(ClipResponse.model_fields)
+
+# Built once; validates/serializes a whole page in a single pydantic-core call
+_CLIP_LIST_ADAPTER = TypeAdapter(list[ClipListItemResponse])
+
+# Constant MessageResponse body for delete_clip, encoded once
+_DELETED_BODY = orjson.dumps({"message": "Clip deleted successfully"})
+
+
+def _validation_enabled() -> bool:
+    """Whether DB rows should be checked against the response models."""
+    settings = get_settings()
+    return settings.DEBUG or not settings.SKIP_RESPONSE_VALIDATION
+
+
+def _clip_payload(row: dict) -> dict:
+    """
+    Shape a clip row for the response body.
+    Rows are only projected to ClipResponse's fields (insert / rpc results
+    come back as whole rows, user_id included) unless strict validation is
+    enabled, in which case they go through ClipResponse first.
+    """
+    if not _validation_enabled():
+        return {key: row[key] for key in ClipResponse.model_fields if key in row}
+    # Python-mode dump: datetimes are left for orjson to encode natively
+    return ClipResponse.model_validate(row).model_dump()
+
 
-@router.post("", response_model=ClipResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=ClipResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=json_body_openapi(CreateClipRequest)
+)
 async def create_clip(
-    request: CreateClipRequest,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    # Dependencies resolve in order: authenticate before reading the body
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    request: Annotated[CreateClipRequest, Depends(json_body(CreateClipRequest))],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """
     Create a new audio clip.
     Sets status to 'pending' for background processing.
     """
-    supabase = get_supabase_client()
-    
     # Insert into audio_clips table
-    result = supabase.table("audio_clips").insert({
+    result = await asyncio.to_thread(supabase.table("audio_clips").insert({
         "user_id": user.id,
         "input_type": request.input_type,
         "input_content": request.input_content,
         "target_duration": request.target_duration,
         "context_instruction": request.context_instruction,
         "status": "pending"
-    }).execute()
+    }).execute)
     
     if not result or not result.data:
         raise HTTPException(
@@ -38,43 +86,36 @@ async def create_clip(
             detail="Failed to create clip"
         )
     
+    # playback_progress is seeded with a zero row by the
+    # audio_clips_init_playback_progress trigger (migrations/001)
     new_clip = result.data[0]
     
-    # Initialize playback progress to 0 for the new clip
-    # This ensures the frontend sees a 0% progress bar instead of null
-    try:
-        supabase.table("playback_progress").insert({
-            "user_id": user.id,
-            "clip_id": new_clip["id"],
-            "position_seconds": 0,
-            "has_completed": False
-        }).execute()
-    except Exception as e:
-        # Log error but don't fail clip creation if progress initialization fails
-        print(f"[ERROR] Failed to initialize playback progress for clip {new_clip['id']}: {e}")
-    
-    return ClipResponse(**new_clip)
+    return ORJSONResponse(content=_clip_payload(new_clip), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=ClipsListResponse)
 async def list_clips(
     user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_db)],
     status_filter: Optional[Literal["pending", "processing", "completed", "failed"]] = Query(
         None, alias="status", description="Filter by status"
     ),
     favorited: Optional[bool] = Query(None, description="Filter by favorited"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    before: Optional[datetime] = Query(
+        None, description="Only clips created before this time (keyset cursor; use instead of offset)"
+    ),
+    exact_count: bool = Query(False, description="Return an exact total instead of an estimate")
 ):
     """
     List user's audio clips with optional filtering.
     Returns newest first.
     """
-    supabase = get_supabase_client()
-    
-    # Build query
+    # Estimated counts are exact for small result sets and fall back to the
+    # planner estimate for large ones, avoiding a full count per page
     query = supabase.table("audio_clips")\
-        .select("*", count="exact")\
+        .select(_LIST_COLUMNS, count="exact" if exact_count else "estimated")\
         .eq("user_id", user.id)\
         .order("created_at", desc=True)\
         .range(offset, offset + limit - 1)
@@ -84,29 +125,38 @@ async def list_clips(
         query = query.eq("status", status_filter)
     if favorited is not None:
         query = query.eq("is_favorited", favorited)
+    # Keyset paging walks the (user_id, created_at) index directly instead of
+    # scanning and discarding `offset` rows
+    if before is not None:
+        query = query.lt("created_at", before.isoformat())
     
-    result = query.execute()
+    result = await asyncio.to_thread(query.execute)
     
-    return ClipsListResponse(
-        clips=[ClipResponse(**clip) for clip in result.data],
-        total=result.count or 0
-    )
+    clips = result.data
+    if _validation_enabled():
+        clips = _CLIP_LIST_ADAPTER.dump_python(_CLIP_LIST_ADAPTER.validate_python(clips))
+    
+    return ORJSONResponse(content={
+        "clips": clips,
+        "total": result.count or 0
+    })
 
 
 @router.get("/{clip_id}", response_model=ClipResponse)
 async def get_clip(
     clip_id: str,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """Get a single clip by ID."""
-    supabase = get_supabase_client()
-    
-    result = supabase.table("audio_clips")\
-        .select("*")\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .single()\
-        .execute()
+    result = await asyncio.to_thread(
+        supabase.table("audio_clips")
+            .select(_CLIP_COLUMNS)
+            .eq("id", clip_id)
+            .eq("user_id", user.id)
+            .single()
+            .execute
+    )
     
     if not result.data:
         raise HTTPException(
@@ -114,57 +164,47 @@ async def get_clip(
             detail="Clip not found"
         )
     
-    return ClipResponse(**result.data)
+    return ORJSONResponse(content=_clip_payload(result.data))
 
 
 @router.patch("/{clip_id}/favorite", response_model=ClipResponse)
 async def toggle_favorite(
     clip_id: str,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """Toggle the favorite status of a clip."""
-    supabase = get_supabase_client()
-    
-    # First get current state
-    current = supabase.table("audio_clips")\
-        .select("is_favorited")\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .single()\
-        .execute()
+    # Atomic flip in Postgres (migrations/002), returns the updated row
+    result = await asyncio.to_thread(supabase.rpc("toggle_clip_favorite", {
+        "p_clip_id": clip_id,
+        "p_user_id": user.id
+    }).execute)
     
-    if not current.data:
+    if not result.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clip not found"
         )
     
-    # Toggle and update
-    new_value = not current.data["is_favorited"]
-    result = supabase.table("audio_clips")\
-        .update({"is_favorited": new_value})\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .execute()
-    
-    return ClipResponse(**result.data[0])
+    return ORJSONResponse(content=_clip_payload(result.data[0]))
 
 
 @router.delete("/{clip_id}", response_model=MessageResponse)
 async def delete_clip(
     clip_id: str,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """Delete a clip and its associated audio file."""
-    supabase = get_supabase_client()
-    
     # Get clip to check ownership and get audio URL
-    clip = supabase.table("audio_clips")\
-        .select("audio_url")\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .single()\
-        .execute()
+    clip = await asyncio.to_thread(
+        supabase.table("audio_clips")
+            .select("audio_url")
+            .eq("id", clip_id)
+            .eq("user_id", user.id)
+            .single()
+            .execute
+    )
     
     if not clip.data:
         raise HTTPException(
@@ -172,23 +212,33 @@ async def delete_clip(
             detail="Clip not found"
         )
     
-    # Delete from storage if audio exists
-    if clip.data.get("audio_url"):
-        try:
-            # Extract filename from the clip_id (format: {clip_id}.mp3)
-            filename = f"{clip_id}.mp3"
-            supabase.storage.from_("audio-files").remove([filename])
-        except Exception as e:
-            print(f"[WARNING] Failed to delete audio file: {e}")
-            pass  # Non-critical, continue with DB deletion
-    
     # Delete from database (cascades to playback_progress via FK)
-    supabase.table("audio_clips")\
-        .delete()\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .execute()
+    db_delete = asyncio.to_thread(
+        supabase.table("audio_clips")
+            .delete()
+            .eq("id", clip_id)
+            .eq("user_id", user.id)
+            .execute
+    )
     
-    return MessageResponse(message="Clip deleted successfully")
+    # Delete from storage if audio exists, concurrently with the DB delete
+    if clip.data.get("audio_url"):
+        # Extract filename from the clip_id (format: {clip_id}.mp3)
+        filename = f"{clip_id}.mp3"
+        storage_delete = asyncio.to_thread(
+            supabase.storage.from_("audio-files").remove, [filename]
+        )
+        db_result, storage_result = await asyncio.gather(
+            db_delete, storage_delete, return_exceptions=True
+        )
+        if isinstance(storage_result, Exception):
+            # Non-critical, the DB row is what the user sees
+            logger.warning("Failed to delete audio file for clip %s: %s", clip_id, storage_result)
+        if isinstance(db_result, Exception):
+            raise db_result
+    else:
+        await db_delete
+    
+    return Response(content=_DELETED_BODY, media_type="application/json")
 
 
@@ -1,109 +1,98 @@
 """
 Playback progress endpoints.
 """
+import asyncio
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from services.auth import get_current_user, AuthenticatedUser
-from services.database import get_supabase_client
+from supabase import Client
+from services.database import get_db
 from models.requests import UpdateProgressRequest
 from models.responses import PlaybackProgressResponse
+from serialization import ORJSONResponse, json_body, json_body_openapi
 
 router = APIRouter(prefix="/clips", tags=["playback"])
 
 
+def _progress_payload(clip_id: str, row: dict | None) -> dict:
+    """
+    Shape a playback_progress row as a PlaybackProgressResponse body.
+    Rows come straight from the DB, so no model is built; a missing row
+    yields the zero-progress defaults.
+    """
+    if not row:
+        return {"clip_id": clip_id, "position_seconds": 0, "has_completed": False, "last_played_at": None}
+    return {
+        "clip_id": clip_id,
+        "position_seconds": row["position_seconds"],
+        "has_completed": row["has_completed"],
+        "last_played_at": row.get("last_played_at")
+    }
+
+
 @router.get("/{clip_id}/progress", response_model=PlaybackProgressResponse)
 async def get_progress(
     clip_id: str,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """Get playback progress for a clip."""
-    supabase = get_supabase_client()
-    
-    # Verify clip exists and belongs to user
-    clip = supabase.table("audio_clips")\
-        .select("id")\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .single()\
-        .execute()
+    # One round-trip: the clip row (ownership) with its progress embedded
+    # via the playback_progress.clip_id foreign key
+    result = await asyncio.to_thread(
+        supabase.table("audio_clips")
+            .select("id, playback_progress(position_seconds, has_completed, last_played_at)")
+            .eq("id", clip_id)
+            .eq("user_id", user.id)
+            .eq("playback_progress.user_id", user.id)
+            .maybe_single()
+            .execute
+    )
     
-    if not clip.data:
+    if not result or not result.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clip not found"
         )
     
-    # Get progress (may not exist yet)
-    try:
-        result = supabase.table("playback_progress")\
-            .select("*")\
-            .eq("clip_id", clip_id)\
-            .eq("user_id", user.id)\
-            .maybe_single()\
-            .execute()
-        
-        if result and result.data:
-            return PlaybackProgressResponse(
-                clip_id=clip_id,
-                position_seconds=result.data["position_seconds"],
-                has_completed=result.data["has_completed"],
-                last_played_at=result.data["last_played_at"]
-            )
-    except Exception as e:
-        # Log error and return defaults if progress can't be fetched
-        print(f"[ERROR] Failed to fetch playback progress: {e}")
-    
-    # No progress yet or error occurred, return defaults
-    return PlaybackProgressResponse(clip_id=clip_id)
+    # Progress may not exist yet (embedded as an empty list)
+    progress = result.data.get("playback_progress")
+    return ORJSONResponse(content=_progress_payload(clip_id, progress[0] if progress else None))
 
 
-@router.put("/{clip_id}/progress", response_model=PlaybackProgressResponse)
+# Called on a timer by the audio player, so the body takes the single-pass
+# json_body parser rather than FastAPI's decode-then-validate
+@router.put(
+    "/{clip_id}/progress",
+    response_model=PlaybackProgressResponse,
+    openapi_extra=json_body_openapi(UpdateProgressRequest)
+)
 async def update_progress(
     clip_id: str,
-    request: UpdateProgressRequest,
-    user: Annotated[AuthenticatedUser, Depends(get_current_user)]
+    # Dependencies resolve in order: authenticate before reading the body
+    user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    request: Annotated[UpdateProgressRequest, Depends(json_body(UpdateProgressRequest))],
+    supabase: Annotated[Client, Depends(get_db)]
 ):
     """
     Update playback progress (upsert).
     Creates record if doesn't exist, updates if it does.
     """
-    supabase = get_supabase_client()
+    # Ownership check and upsert in one statement (migrations/005);
+    # no row back means the clip isn't the user's
+    result = await asyncio.to_thread(supabase.rpc("upsert_playback_progress", {
+        "p_clip_id": clip_id,
+        "p_user_id": user.id,
+        "p_position_seconds": request.position_seconds,
+        "p_has_completed": request.has_completed
+    }).execute)
     
-    # Verify clip exists and belongs to user
-    clip = supabase.table("audio_clips")\
-        .select("id")\
-        .eq("id", clip_id)\
-        .eq("user_id", user.id)\
-        .single()\
-        .execute()
-    
-    if not clip.data:
+    if not result.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Clip not found"
         )
     
-    # Upsert progress record
-    result = supabase.table("playback_progress")\
-        .upsert({
-            "user_id": user.id,
-            "clip_id": clip_id,
-            "position_seconds": request.position_seconds,
-            "has_completed": request.has_completed
-        }, on_conflict="user_id,clip_id")\
-        .execute()
-    
-    if not result or not result.data:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update playback progress"
-        )
-    
-    return PlaybackProgressResponse(
-        clip_id=clip_id,
-        position_seconds=result.data[0]["position_seconds"],
-        has_completed=result.data[0]["has_completed"],
-        last_played_at=result.data[0].get("last_played_at")
-    )
+    return ORJSONResponse(content=_progress_payload(clip_id, result.data[0]))
 
 
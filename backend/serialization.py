@@ -0,0 +1,74 @@
+"""
+JSON serialization for API requests and responses.
+"""
+from typing import Any, Awaitable, Callable, TypeVar
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from fastapi.utils import is_body_allowed_for_status_code
+from pydantic import BaseModel, ValidationError
+from starlette.exceptions import HTTPException
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# datetimes are encoded natively by orjson; naive ones are treated as UTC
+# and UTC renders as "Z", matching the timestamps Supabase returns
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson instead of the stdlib encoder.
+
+    Returning this directly from a route skips FastAPI's jsonable_encoder and
+    response_model validation, so it is meant for data that is already in its
+    wire shape (e.g. rows straight from Supabase).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def json_body(model: type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """
+    Dependency that parses and validates a JSON request body in a single
+    pydantic-core pass (model_validate_json), instead of FastAPI's
+    json.loads followed by validation of the resulting dict.
+    Errors are re-raised as RequestValidationError so clients still get 422.
+    Pair with json_body_openapi(model) so the body stays documented.
+    """
+    async def parse(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    
+    return parse
+
+
+def json_body_openapi(model: type[BaseModel]) -> dict:
+    """OpenAPI request body entry for a route that uses json_body(model)."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
+
+
+async def http_exception_handler(request: Request, exc: HTTPException) -> Response:
+    """FastAPI's default HTTPException handler, rendered with orjson."""
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> Response:
+    """FastAPI's default 422 handler, rendered with orjson."""
+    return ORJSONResponse({"detail": jsonable_encoder(exc.errors())}, status_code=422)
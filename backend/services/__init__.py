@@ -1,7 +1,7 @@
 """Service layer for auth and database operations."""
 from services.auth import get_current_user, AuthenticatedUser
-from services.database import get_supabase_client
+from services.database import get_supabase_client, get_db, close_supabase_client, warm_supabase_client
 
-__all__ = ["get_current_user", "AuthenticatedUser", "get_supabase_client"]
+__all__ = ["get_current_user", "AuthenticatedUser", "get_supabase_client", "get_db", "close_supabase_client", "warm_supabase_client"]
 
 
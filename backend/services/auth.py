@@ -1,6 +1,10 @@
 """
 Authentication middleware using Supabase JWT.
 """
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Annotated
 from dataclasses import dataclass
 import jwt
@@ -11,6 +15,22 @@ from config import get_settings
 # Bearer token extractor
 security = HTTPBearer()
 
+# Decoder, algorithm list and key bytes are built once, so a cache miss
+# only pays for the HMAC check and claim validation
+_jwt = jwt.PyJWT()
+_JWT_ALGORITHMS = ["HS256"]
+
+# Verified payloads keyed by a token digest, LRU-bounded. Entries live until
+# the token's exp, capped at _TOKEN_CACHE_TTL seconds
+_TOKEN_CACHE_SIZE = 4096
+_TOKEN_CACHE_TTL = 300
+_token_cache: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+
+def _cache_key(token: str) -> bytes:
+    """Short digest of the token, so the cache doesn't hold full JWTs."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 
 @dataclass
 class AuthenticatedUser:
@@ -19,22 +39,37 @@ class AuthenticatedUser:
     email: str | None = None
 
 
+@lru_cache()
+def _jwt_key() -> bytes:
+    """HS256 secret, encoded once."""
+    return get_settings().SUPABASE_JWT_SECRET.encode()
+
+
 def verify_token(token: str) -> dict:
     """
     Verify Supabase JWT and extract payload.
     Raises HTTPException if invalid.
     """
-    settings = get_settings()
+    # HS256 verification is a pure function of the token (the secret is
+    # fixed per process), so a verified payload can be reused until exp
+    key = _cache_key(token)
+    now = time.time()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        if now < expires_at:
+            _token_cache.move_to_end(key)
+            return payload
+        del _token_cache[key]
     
     try:
         # Decode and verify the JWT
-        payload = jwt.decode(
+        payload = _jwt.decode(
             token,
-            settings.SUPABASE_JWT_SECRET,
-            algorithms=["HS256"],
+            _jwt_key(),
+            algorithms=_JWT_ALGORITHMS,
             audience="authenticated"
         )
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,6 +80,14 @@ def verify_token(token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}"
         )
+    
+    # Only tokens that expire are cached
+    if "exp" in payload:
+        _token_cache[key] = (payload, min(float(payload["exp"]), now + _TOKEN_CACHE_TTL))
+        if len(_token_cache) > _TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return payload
 
 
 async def get_current_user(
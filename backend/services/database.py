@@ -1,10 +1,41 @@
 """
 Supabase client initialization. Singleton pattern.
 """
+import logging
 from functools import lru_cache
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 from config import get_settings
 
+logger = logging.getLogger(__name__)
+
+# Max concurrent Supabase requests per process (SUPABASE_MAX_CONNECTIONS);
+# also sizes the app's to_thread executor so every pooled connection can be
+# in use at once
+SUPABASE_POOL_SIZE = get_settings().SUPABASE_MAX_CONNECTIONS
+
+# Keep-alive pool shared by the PostgREST and Storage clients, so requests
+# reuse open TLS connections instead of reconnecting per call. With HTTP/2,
+# concurrent requests are multiplexed as streams over those connections
+_POOL_LIMITS = httpx.Limits(
+    max_connections=SUPABASE_POOL_SIZE,
+    max_keepalive_connections=SUPABASE_POOL_SIZE // 2,
+    keepalive_expiry=60
+)
+# Matches supabase-py's PostgREST default; a custom client replaces per-service timeouts
+_POOL_TIMEOUT = httpx.Timeout(120, connect=10)
+# Retries only failed connection attempts (nothing was sent), so it's safe
+# for non-idempotent calls too
+_CONNECT_RETRIES = 3
+
+
+@lru_cache()
+def get_http_client() -> httpx.Client:
+    """Create and cache the pooled HTTP client used for Supabase calls."""
+    transport = httpx.HTTPTransport(http2=True, limits=_POOL_LIMITS, retries=_CONNECT_RETRIES)
+    return httpx.Client(transport=transport, timeout=_POOL_TIMEOUT)
+
 
 @lru_cache()
 def get_supabase_client() -> Client:
@@ -13,6 +44,37 @@ def get_supabase_client() -> Client:
     Uses service role key for backend operations.
     """
     settings = get_settings()
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return create_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_KEY,
+        options=SyncClientOptions(httpx_client=get_http_client())
+    )
+
 
+def warm_supabase_client() -> None:
+    """
+    Build the client and open a pooled connection with one cheap query, so
+    the first real request doesn't pay for DNS + TLS setup. Failures are
+    logged, not raised: the app can still start and retry lazily.
+    """
+    try:
+        get_supabase_client().table("audio_clips").select("id").limit(1).execute()
+    except Exception as e:
+        logger.warning("Supabase warm-up failed: %s", e)
+
+
+def close_supabase_client() -> None:
+    """Close pooled connections; called on app shutdown."""
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+    get_supabase_client.cache_clear()
 
+
+async def get_db() -> Client:
+    """
+    FastAPI dependency returning the shared Supabase client.
+    Declared async so it resolves inline rather than in the threadpool.
+    Tests swap the client via app.dependency_overrides[get_db].
+    """
+    return get_supabase_client()
@@ -29,7 +29,7 @@ class GraphState(TypedDict, total=False):
     extracted_content: Optional[str]
     page_title: Optional[str]
     script: Optional[str]
-    audio_data: Optional[bytes]
+    audio_path: Optional[str]
     audio_filename: Optional[str]
     audio_url: Optional[str]
     actual_duration: Optional[float]
@@ -47,6 +47,14 @@ def route_input(state: dict) -> Literal["process_note", "scrape_url"]:
     return "process_note" if state["input_type"] == "note" else "scrape_url"
 
 
+def route_after_scrape(state: dict) -> Literal["generate_script", "__end__"]:
+    """
+    Stop early if the page couldn't be scraped, so the scrape error is the
+    one recorded instead of a downstream "no script" failure.
+    """
+    return END if state.get("error") else "generate_script"
+
+
 def build_processing_graph():
     """
     Build and compile the audio processing graph.
@@ -54,6 +62,7 @@ def build_processing_graph():
     Graph structure:
         START → router → [process_note OR scrape_url] → generate_script
         → text_to_speech → save_audio → update_status → END
+        (scrape_url → END if the page couldn't be scraped)
     """
     # Initialize graph with dict-based state schema
     workflow = StateGraph(GraphState)
@@ -78,7 +87,7 @@ def build_processing_graph():
     # Connect nodes in sequence
     # Both note and URL paths converge at generate_script
     workflow.add_edge("process_note", "generate_script")
-    workflow.add_edge("scrape_url", "generate_script")
+    workflow.add_conditional_edges("scrape_url", route_after_scrape)
     
     # Linear flow from script generation to completion
     workflow.add_edge("generate_script", "text_to_speech")
@@ -8,12 +8,95 @@ Each node is a function that:
 
 Nodes should be pure functions focused on a single responsibility.
 """
+import logging
+import os
+import tempfile
 from typing import Dict, Any
+from functools import lru_cache
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from config import get_settings
 from services.llm_service import get_llm
 
+logger = logging.getLogger(__name__)
+
+# Script generation prompt. Everything that doesn't vary per clip (role,
+# style rules, instructions) lives in the system message so the provider can
+# reuse the cached prefix; only the human message changes between calls
+SCRIPT_SYSTEM_PROMPT = """You are an expert at every topic. Your job is to transform written content into engaging spoken-word scripts.
+
+Key requirements:
+- Write for EARS, not eyes - no bullet points, lists, or visual formatting
+- Be direct and answer directly, do not have entire sentences of fluff or padding, get to the point
+- Use a conversational, natural speaking style
+- Be informative and credible - speak with authority
+- Use smooth transitions between ideas
+- Include natural pauses and breathing room in the narrative
+- Make complex topics accessible without dumbing them down
+- Provide concise and formal definitions where appropriate, you can explain further if necessary
+
+Your scripts should sound like an engaging expert explaining something
+
+CRITICAL: You MUST base your script on the content provided by the user. Do not generate content about unrelated topics. If the content is a question, answer that question. If the content is a topic, explain that topic.
+
+INSTRUCTIONS:
+1. Craft a natural, conversational script that flows smoothly when read aloud to answer a question or provide information on a topic directly
+2. Target the word count given with the content (it sets the length of the audio)
+3. Open with a MAX one sentence hook about the topic to engage the listener, or get to the point, DO NOT BE GENERIC OR REPETITIVE
+4. Present information in a logical, direct and engaging narrative
+5. Use natural speech patterns - contractions, rhetorical questions, etc.
+6. Close with a key takeaway
+7. NO bullet points, lists, or "wall of text" - just natural spoken narrative
+8. Unless specifically asked, do not oversimplify the topic or dumb down the content
+9. Provide concise and formal definitions where appropriate, you can explain further if necessary
+
+Write ONLY the script - no meta-commentary, stage directions, or labels."""
+
+SCRIPT_USER_PROMPT = """Create an audio script based on the following content as if you are an expert on the topic.
+
+TARGET DURATION: {target_duration} minutes (approximately {target_word_count} words)
+{context_section}
+
+CONTENT TO TRANSFORM:
+{content}"""
+
+# Shared by every script request so they land on the same provider-side
+# prefix cache for SCRIPT_SYSTEM_PROMPT
+_SCRIPT_CACHE_KEY = "echo-script-v1"
+
+# Parsed once at import; each clip only pays for formatting
+_SCRIPT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SCRIPT_SYSTEM_PROMPT),
+    ("human", SCRIPT_USER_PROMPT)
+])
+
+
+# Upper bound on source text sent to the LLM (~5k tokens). Notes are capped
+# at 10k chars by the API, but scraped pages can be arbitrarily long
+MAX_CONTENT_CHARS = 20000
+_CONTENT_HEAD_CHARS = 16000
+_CONTENT_TAIL_CHARS = 3000
+
+
+def _truncate_content(content: str) -> str:
+    """
+    Keep the head and tail of overly long content. Deterministic, so the
+    same input always yields the same prompt.
+    """
+    if len(content) <= MAX_CONTENT_CHARS:
+        return content
+    return content[:_CONTENT_HEAD_CHARS] + "\n\n[...]\n\n" + content[-_CONTENT_TAIL_CHARS:]
+
+
+@lru_cache()
+def _get_script_chain():
+    """
+    prompt | llm | parser chain for script generation, built on first use.
+    Deferred rather than module-level so importing nodes doesn't need LLM
+    credentials.
+    """
+    llm = get_llm(temperature=0.7, prompt_cache_key=_SCRIPT_CACHE_KEY)
+    return _SCRIPT_PROMPT | llm | StrOutputParser()
+
 
 def process_note_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -22,7 +105,7 @@ def process_note_node(state: Dict[str, Any]) -> Dict[str, Any]:
     For note inputs, the content is already text, so we just
     copy it to extracted_content for the next node.
     """
-    print(f"[NODE] Processing note input for clip {state['clip_id']}")
+    logger.debug("node=process_note clip=%s", state["clip_id"])
     state["extracted_content"] = state["input_content"]
     return state
 
@@ -31,16 +114,21 @@ def scrape_url_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Extract text content from URL.
     
-    TODO: Implement web scraping logic
-    - Fetch URL content
-    - Extract main text (remove nav, ads, etc.)
-    - Extract page title
-    - Handle errors gracefully
+    Fetches the page and extracts its main text and title
+    (see services.scraper). Sets state["error"] if nothing usable
+    could be extracted.
     """
-    print(f"[NODE] Scraping URL for clip {state['clip_id']}")
-    # Placeholder - will implement with trafilatura or beautifulsoup4
-    state["extracted_content"] = "TODO: Implement URL scraping"
-    state["page_title"] = "TODO: Extract title"
+    logger.debug("node=scrape_url clip=%s", state["clip_id"])
+    
+    from services.scraper import scrape_url
+    
+    result = scrape_url(state["input_content"])
+    if result.get("error"):
+        state["error"] = result["error"]
+        return state
+    
+    state["extracted_content"] = result["content"]
+    state["page_title"] = result["title"] or None
     return state
 
 
@@ -56,96 +144,53 @@ def generate_script_node(state: Dict[str, Any]) -> Dict[str, Any]:
     - Appropriate length for target duration
     - Direct and to the point, do not be generic or repetitive
     """
-    print(f"[NODE] Generating script for clip {state['clip_id']}")
-    
-    settings = get_settings()
+    logger.debug("node=generate_script clip=%s", state["clip_id"])
     
     # Calculate target word count based on duration
     # Average speaking rate: ~150 words per minute for
     target_duration_minutes = state["target_duration"]
     target_word_count = target_duration_minutes * 150
     
-    # Build the prompt
-    system_prompt = """You are an expert at every topic. Your job is to transform written content into engaging spoken-word scripts.
-
-Key requirements:
-- Write for EARS, not eyes - no bullet points, lists, or visual formatting
-- Be direct and answer directly, do not have entire sentences of fluff or padding, get to the point
-- Use a conversational, natural speaking style
-- Be informative and credible - speak with authority
-- Use smooth transitions between ideas
-- Include natural pauses and breathing room in the narrative
-- Make complex topics accessible without dumbing them down
-- Provide concise and formal definitions where appropriate, you can explain further if necessary
-
-Your scripts should sound like an engaging expert explaining something"""
-
-    user_prompt = """Create an audio script based on the following content as if you are an expert on the topic.
-
-TARGET DURATION: {target_duration} minutes (approximately {target_word_count} words)
-{context_section}
-
-CONTENT TO TRANSFORM:
-{content}
-
-CRITICAL: You MUST base your script on the content provided above. Do not generate content about unrelated topics. If the content is a question, answer that question. If the content is a topic, explain that topic.
-
-INSTRUCTIONS:
-1. Craft a natural, conversational script that flows smoothly when read aloud to answer a question or provide information on a topic directly
-2. Target approximately {target_word_count} words (for {target_duration} minutes of audio)
-3. Open with a MAX one sentence hook about the topic to engage the listener, or get to the point, DO NOT BE GENERIC OR REPETITIVE
-4. Present information in a logical, direct and engaging narrative
-5. Use natural speech patterns - contractions, rhetorical questions, etc.
-6. Close with a key takeaway
-7. NO bullet points, lists, or "wall of text" - just natural spoken narrative
-8. Unless specifically asked, do not oversimplify the topic or dumb down the content
-9. Provide concise and formal definitions where appropriate, you can explain further if necessary
-
-Write ONLY the script - no meta-commentary, stage directions, or labels."""
-
     # Add context instruction if provided
-    context_section = ""
-    if state.get("context_instruction"):
-        context_section = f"\nSPECIAL FOCUS: {state['context_instruction']}"
-    
-    # Create the prompt template
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", user_prompt)
-    ])
-    
-    # Initialize LLM with default settings
-    llm = get_llm(temperature=0.7)
-    
-    # Create chain
-    chain = prompt | llm | StrOutputParser()
+    context_section = f"\nSPECIAL FOCUS: {focus}" if (focus := state.get("context_instruction")) else ""
     
     # Generate script
     try:
-        script = chain.invoke({
+        script = _get_script_chain().invoke({
             "target_duration": target_duration_minutes,
             "target_word_count": target_word_count,
             "context_section": context_section,
-            "content": state["extracted_content"]
+            "content": _truncate_content(state["extracted_content"])
         })
         
         state["script"] = script.strip()
-        print(f"[NODE] Generated script: {len(script.split())} words (target: {target_word_count})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated script: %d words (target: %d)", len(script.split()), target_word_count)
         
     except Exception as e:
-        print(f"[ERROR] Script generation failed: {e}")
+        logger.exception("Script generation failed for clip %s", state["clip_id"])
         state["error"] = f"Script generation failed: {str(e)}"
     
     return state
 
 
+def discard_audio_file(path: str) -> None:
+    """Remove a spooled audio file, ignoring one that's already gone."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 def text_to_speech_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Convert script to audio using TTS API.
     
     Uses ElevenLabs TTS to generate high-quality audio from the script.
+    The audio is streamed to a temp file and only its path is kept in
+    state; save_audio_node uploads from it and removes it.
     """
-    print(f"[NODE] Converting script to audio for clip {state['clip_id']}")
+    logger.debug("node=text_to_speech clip=%s", state["clip_id"])
     
     from services.tts_service import text_to_speech
     
@@ -155,19 +200,28 @@ def text_to_speech_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state["error"] = "No script available for TTS conversion"
         return state
     
-    # Convert to audio
-    result = text_to_speech(script)
+    # Convert to audio. mkstemp creates the file exclusively with a random
+    # name, so nothing else in the shared temp dir (a symlink, or a second
+    # run of the same requeued clip) can be written through
+    fd, audio_path = tempfile.mkstemp(suffix=".mp3", prefix=f"echo-{state['clip_id']}-")
+    os.close(fd)
+    try:
+        result = text_to_speech(script, output_path=audio_path)
+    except BaseException:
+        discard_audio_file(audio_path)
+        raise
     
     # Check for errors
     if result.get("error"):
+        discard_audio_file(audio_path)
         state["error"] = result["error"]
         return state
     
-    # Update state with audio data
-    state["audio_data"] = result["audio_data"]
+    # Update state with a handle to the audio, not the bytes
+    state["audio_path"] = audio_path
     state["actual_duration"] = result["duration"]
     
-    print(f"[NODE] Audio generated: {result['duration']:.2f} seconds")
+    logger.debug("Audio generated: %.2f seconds", result["duration"])
     return state
 
 
@@ -178,33 +232,34 @@ def save_audio_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Uploads the generated MP3 audio to Supabase storage bucket
     and stores the private URL in state.
     """
-    print(f"[NODE] Saving audio for clip {state['clip_id']}")
-    
-    from services.database import get_supabase_client
+    logger.debug("node=save_audio clip=%s", state["clip_id"])
     
     # Check if we have audio data
-    audio_data = state.get("audio_data")
-    if not audio_data:
+    audio_path = state.get("audio_path")
+    if not audio_path:
         state["error"] = "No audio data available to save"
         return state
     
     try:
+        from services.database import get_supabase_client
         supabase = get_supabase_client()
         
         # Generate filename
         filename = f"{state['clip_id']}.mp3"
         
         # Upload to Supabase storage
-        print(f"[NODE] Uploading {len(audio_data)} bytes to storage as {filename}")
+        logger.debug("Uploading %s to storage as %s", audio_path, filename)
         
-        result = supabase.storage.from_("audio-files").upload(
-            path=filename,
-            file=audio_data,
-            file_options={
-                "content-type": "audio/mpeg",
-                "upsert": "true"  # Overwrite if exists
-            }
-        )
+        # Streamed from disk by the HTTP client
+        with open(audio_path, "rb") as audio_file:
+            result = supabase.storage.from_("audio-files").upload(
+                path=filename,
+                file=audio_file,
+                file_options={
+                    "content-type": "audio/mpeg",
+                    "upsert": "true"  # Overwrite if exists
+                }
+            )
         
         # Generate signed URL (expires in 1 year for long-term access)
         # For private buckets, we need signed URLs that include authentication
@@ -219,7 +274,8 @@ def save_audio_node(state: Dict[str, Any]) -> Dict[str, Any]:
         else:
             audio_url = signed_url_response
         
-        print(f"[NODE] Audio uploaded successfully: {audio_url}")
+        # The signed URL is a bearer credential, so only the filename is logged
+        logger.debug("Audio uploaded: %s", filename)
         
         # Update state
         state["audio_filename"] = filename
@@ -227,9 +283,13 @@ def save_audio_node(state: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         error_msg = f"Failed to save audio: {str(e)}"
-        print(f"[ERROR] {error_msg}")
+        logger.exception(error_msg)
         state["error"] = error_msg
     
+    finally:
+        # The temp file is only needed for the upload
+        discard_audio_file(audio_path)
+    
     return state
 
 
@@ -241,12 +301,11 @@ def update_clip_status_node(state: Dict[str, Any]) -> Dict[str, Any]:
     - Sets status to "completed"
     - Stores audio_url and actual_duration
     - Sets page_title (if available from URL scraping)
-    - Records completed_at timestamp
+    - completed_at is recorded by the DB trigger on the status change
     """
-    print(f"[NODE] Updating clip status for {state['clip_id']}")
+    logger.debug("node=update_status clip=%s", state["clip_id"])
     
     from services.database import get_supabase_client
-    from datetime import datetime
     
     try:
         supabase = get_supabase_client()
@@ -256,8 +315,9 @@ def update_clip_status_node(state: Dict[str, Any]) -> Dict[str, Any]:
             "status": "completed",
             "generated_script": state.get("script"),  # Save the generated script
             "audio_url": state.get("audio_url"),
-            "actual_duration": int(state.get("actual_duration", 0)) if state.get("actual_duration") else None,
-            "completed_at": datetime.utcnow().isoformat()
+            "actual_duration": int(state.get("actual_duration", 0)) if state.get("actual_duration") else None
+            # completed_at is stamped by the audio_clips_stamp_status_times
+            # trigger (migrations/007)
         }
         
         # Add page_title if available (for URL inputs)
@@ -268,13 +328,13 @@ def update_clip_status_node(state: Dict[str, Any]) -> Dict[str, Any]:
         result = supabase.table("audio_clips").update(update_data).eq("id", state["clip_id"]).execute()
         
         if not result.data:
-            print(f"[WARNING] Database update returned no data for clip {state['clip_id']}")
+            logger.warning("Database update returned no data for clip %s", state["clip_id"])
         else:
-            print(f"[NODE] Clip {state['clip_id']} marked as completed")
+            logger.debug("Clip %s marked as completed", state["clip_id"])
         
     except Exception as e:
         error_msg = f"Failed to update clip status: {str(e)}"
-        print(f"[ERROR] {error_msg}")
+        logger.exception(error_msg)
         state["error"] = error_msg
     
     return state
@@ -5,12 +5,17 @@ Defines the data structure that flows through the graph nodes.
 Each node reads from and writes to this state.
 """
 from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ProcessingState(BaseModel):
     """State object passed between graph nodes."""
     
+    # Built once per clip to validate the DB row, then dumped to the plain
+    # dict the graph actually passes around (GraphState); nothing assigns
+    # to it afterwards
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+    
     # Input data (from database)
     clip_id: str = Field(description="Database ID of the clip")
     input_type: Literal["url", "note"] = Field(description="Type of input")
@@ -22,15 +27,11 @@ class ProcessingState(BaseModel):
     extracted_content: Optional[str] = Field(default=None, description="Extracted text from URL or note")
     page_title: Optional[str] = Field(default=None, description="Title extracted from URL")
     script: Optional[str] = Field(default=None, description="Generated spoken-word script")
-    audio_data: Optional[bytes] = Field(default=None, description="Generated audio file bytes")
+    # Audio is spooled to disk; state only carries the path, not the bytes
+    audio_path: Optional[str] = Field(default=None, description="Temp file holding the generated audio")
     audio_filename: Optional[str] = Field(default=None, description="Storage filename for audio")
     audio_url: Optional[str] = Field(default=None, description="Public URL to stored audio")
     actual_duration: Optional[int] = Field(default=None, description="Actual audio duration in seconds")
     
     # Error handling
     error: Optional[str] = Field(default=None, description="Error message if processing fails")
-    
-    class Config:
-        arbitrary_types_allowed = True
-
-
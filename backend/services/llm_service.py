@@ -10,16 +10,21 @@ TODO: Consider adding
 - Retry logic for API failures
 - Cost tracking
 """
+from functools import lru_cache
 from typing import Optional, Union
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from config import get_settings
 
 # those are the default values for the LLM, can be overridden if needed
+# Cached per argument combination so each client (and its HTTP pool) is
+# built once per process instead of on every script generation
+@lru_cache(maxsize=8)
 def get_llm(
     model: Optional[str] = None, 
     temperature: float = 0.7,
-    provider: Optional[str] = None
+    provider: Optional[str] = None,
+    prompt_cache_key: Optional[str] = None
 ) -> Union[ChatOpenAI, ChatGoogleGenerativeAI]:
     """
     Get configured LLM instance based on provider.
@@ -28,6 +33,9 @@ def get_llm(
         model: Model name (overrides DEFAULT_LLM_MODEL if provided)
         temperature: Sampling temperature (0-1)
         provider: Provider name ('openai' or 'google') (overrides DEFAULT_LLM_PROVIDER if provided)
+        prompt_cache_key: OpenAI only. Requests sharing a key are routed to the
+            same cache, so a common prompt prefix is billed at the cached rate.
+            Gemini caches repeated prefixes implicitly and ignores it.
         
     Returns:
         Configured LLM instance (ChatOpenAI or ChatGoogleGenerativeAI)
@@ -49,7 +57,8 @@ def get_llm(
     return ChatOpenAI(
         model=model,
         temperature=temperature,
-        api_key=settings.OPENAI_API_KEY
+        api_key=settings.OPENAI_API_KEY,
+        model_kwargs={"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
     )
 
 
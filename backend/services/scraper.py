@@ -2,15 +2,63 @@
 URL scraping service.
 
 Extracts main text content from URLs, removing navigation, ads, and other noise.
-Will use trafilatura or readability for robust content extraction.
+Pages are fetched with httpx and the article text is pulled out with trafilatura.
 
-TODO: Implement with trafilatura
-- Fetch URL content
-- Extract main text
-- Extract page title
-- Handle common errors (404, timeout, etc.)
+Fetching is network-bound and extraction is CPU-bound, so the async variants
+overlap the fetches and push extraction to a thread.
+
+TODO:
 - Respect robots.txt
 """
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Iterable
+import httpx
+import trafilatura
+
+logger = logging.getLogger(__name__)
+
+# Some sites serve empty shells or 403s to clients without a browser-ish UA
+_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; echo/0.1)"}
+_TIMEOUT = httpx.Timeout(10, connect=5)
+_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=10)
+
+# Concurrent fetches per scrape_urls_async batch
+MAX_CONCURRENT_SCRAPES = 10
+
+
+@lru_cache()
+def _get_client() -> httpx.Client:
+    """Create and cache the HTTP client used by the sync scrape_url."""
+    return httpx.Client(headers=_HEADERS, timeout=_TIMEOUT, limits=_LIMITS, follow_redirects=True)
+
+
+def _error(message: str) -> dict:
+    return {"content": "", "title": "", "error": message}
+
+
+def _extract(html: str, url: str) -> dict:
+    """Pull the main text and title out of a fetched page."""
+    content = trafilatura.extract(html, url=url, include_comments=False, favor_precision=True)
+    if not content:
+        return _error("No readable content found at URL")
+    
+    metadata = trafilatura.extract_metadata(html, default_url=url)
+    title = metadata.title if metadata and metadata.title else ""
+    return {"content": content, "title": title, "error": None}
+
+
+def _fetch_error(url: str, e: Exception) -> dict:
+    """Map a fetch failure to the scrape_url error dict."""
+    if isinstance(e, httpx.HTTPStatusError):
+        message = f"Failed to fetch URL: HTTP {e.response.status_code}"
+    elif isinstance(e, httpx.TimeoutException):
+        message = "Failed to fetch URL: timed out"
+    else:
+        message = f"Failed to fetch URL: {e}"
+    logger.warning("Scrape failed for %s: %s", url, message)
+    return _error(message)
 
 
 def scrape_url(url: str) -> dict:
@@ -19,18 +67,53 @@ def scrape_url(url: str) -> dict:
     
     Args:
         url: The URL to scrape
-        
+    
     Returns:
         dict with keys:
             - content: Main text content
             - title: Page title
-            - error: Error message if scraping failed
+            - error: Error message if scraping failed (None if successful)
     """
-    # TODO: Implement
-    return {
-        "content": "",
-        "title": "",
-        "error": "Not yet implemented"
-    }
+    try:
+        response = _get_client().get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        return _fetch_error(url, e)
+    
+    return _extract(response.text, str(response.url))
+
 
+async def scrape_url_async(url: str, client: httpx.AsyncClient) -> dict:
+    """
+    Async scrape_url using a caller-provided client.
+    Extraction runs in a thread so it doesn't block the event loop.
+    """
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        return _fetch_error(url, e)
+    
+    return await asyncio.to_thread(_extract, response.text, str(response.url))
 
+
+async def scrape_urls_async(urls: Iterable[str]) -> list[dict]:
+    """
+    Scrape several URLs concurrently over one shared client.
+    Results are returned in input order; failures come back as error dicts.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+    
+    async with httpx.AsyncClient(
+        headers=_HEADERS, timeout=_TIMEOUT, limits=_LIMITS, follow_redirects=True
+    ) as client:
+        async def scrape(url: str) -> dict:
+            async with semaphore:
+                return await scrape_url_async(url, client)
+        
+        results = await asyncio.gather(*(scrape(url) for url in urls), return_exceptions=True)
+    
+    return [
+        _error(f"Scraping failed: {result}") if isinstance(result, Exception) else result
+        for result in results
+    ]
@@ -4,14 +4,107 @@ Text-to-speech service.
 Converts text scripts to high-quality audio using ElevenLabs TTS API.
 """
 import io
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterator, Optional
 from elevenlabs.client import ElevenLabs
-from mutagen.mp3 import MP3
 from config import get_settings
 
+logger = logging.getLogger(__name__)
+
+# Standard MP3 quality; CBR, so bitrate alone gives the duration
+_OUTPUT_FORMAT = "mp3_44100_128"
+_OUTPUT_BITRATES = {"mp3_44100_128": 128_000}
+_MODEL_ID = "eleven_turbo_v2_5"  # Fast, high-quality model
+
+# Long scripts are synthesized as sentence-aligned chunks in parallel.
+# ~2500 chars is a little under 3 minutes of speech, so a 10-minute clip
+# becomes 4 concurrent requests instead of one long one
+MAX_CHUNK_CHARS = 2500
+MAX_CONCURRENT_CHUNKS = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str) -> ElevenLabs:
+    """Create and cache the ElevenLabs client (and its HTTP connection pool)."""
+    return ElevenLabs(api_key=api_key)
+
+
+def chunk_script(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list[str]:
+    """
+    Split a script into chunks of at most max_chars, breaking only between
+    sentences. A single sentence longer than max_chars becomes its own chunk.
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _convert_chunks(client: ElevenLabs, chunks: list[str], voice: str) -> Iterator[bytes]:
+    """
+    Synthesize chunks concurrently and yield their audio in script order.
+    Each request gets its neighbours as previous_text/next_text so prosody
+    carries across the joins; CBR MP3 frames concatenate cleanly.
+    """
+    def convert(i: int) -> bytes:
+        return b"".join(client.text_to_speech.convert(
+            text=chunks[i],
+            voice_id=voice,
+            model_id=_MODEL_ID,
+            output_format=_OUTPUT_FORMAT,
+            previous_text=chunks[i - 1] if i > 0 else None,
+            next_text=chunks[i + 1] if i + 1 < len(chunks) else None
+        ))
+    
+    pool = ThreadPoolExecutor(
+        max_workers=min(MAX_CONCURRENT_CHUNKS, len(chunks)), thread_name_prefix="tts"
+    )
+    try:
+        futures = [pool.submit(convert, i) for i in range(len(chunks))]
+        # Earlier chunks are written out while later ones are still synthesizing
+        for future in futures:
+            yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _write_chunks(chunks, path: str) -> int:
+    """Stream audio chunks to a file; returns the number of bytes written."""
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        # Don't leave a truncated file behind for the upload step
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return size
+
+
 # voice of David M336tBVZHWWiWb4R54ui
 # John Doe Gentle iLzHtPh0bW6RGWRG0Xo5
 # William - fjnwTZkKtQOJaYzGLa6n
-def text_to_speech(script: str, voice: str = "iLzHtPh0bW6RGWRG0Xo5") -> dict:
+def text_to_speech(
+    script: str,
+    voice: str = "iLzHtPh0bW6RGWRG0Xo5",
+    output_path: Optional[str] = None
+) -> dict:
     """
     Convert text script to audio using ElevenLabs.
     
@@ -23,48 +116,61 @@ def text_to_speech(script: str, voice: str = "iLzHtPh0bW6RGWRG0Xo5") -> dict:
                - "AZnzlk1XvdvUeBnXmlld" (Domi - strong, male)
                - "EXAVITQu4vr4xnSDxMaL" (Bella - soft, female)
                - "JBFqnCBsd6RMkjVDRZzb" (George - warm, male)
+        output_path: If given, audio is streamed to this file as it arrives
+                     instead of being collected in memory
         
     Returns:
         dict with keys:
-            - audio_data: Audio file bytes (MP3 format)
+            - audio_data: Audio file bytes (MP3 format); empty if output_path is given
             - duration: Duration in seconds
             - error: Error message if conversion failed (None if successful)
     """
     try:
         settings = get_settings()
         
-        # Initialize client
-        client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+        client = _get_client(settings.ELEVENLABS_API_KEY)
         
         # Generate audio
-        print(f"[TTS] Generating audio for {len(script)} characters...")
-        audio_generator = client.text_to_speech.convert(
-            text=script,
-            voice_id=voice,
-            model_id="eleven_turbo_v2_5",  # Fast, high-quality model
-            output_format="mp3_44100_128"  # Standard MP3 quality
-        )
+        chunks = chunk_script(script)
+        logger.info("Generating audio for %d characters in %d chunk(s)", len(script), len(chunks))
+        if len(chunks) > 1:
+            audio_generator = _convert_chunks(client, chunks, voice)
+        else:
+            audio_generator = client.text_to_speech.convert(
+                text=script,
+                voice_id=voice,
+                model_id=_MODEL_ID,
+                output_format=_OUTPUT_FORMAT
+            )
         
-        # Collect audio bytes from generator
-        audio_chunks = []
-        for chunk in audio_generator:
-            audio_chunks.append(chunk)
+        if output_path:
+            # Only one chunk is held in memory at a time
+            audio_data = b""
+            size = _write_chunks(audio_generator, output_path)
+        else:
+            # Collect audio bytes from generator
+            audio_chunks = []
+            for chunk in audio_generator:
+                audio_chunks.append(chunk)
+            
+            audio_data = b"".join(audio_chunks)
+            size = len(audio_data)
+        logger.debug("Generated %d bytes of audio", size)
         
-        audio_data = b"".join(audio_chunks)
-        print(f"[TTS] Generated {len(audio_data)} bytes of audio")
+        # Output is constant-bitrate MP3, so duration follows from the size
+        # without parsing every frame
+        duration = size * 8 / _OUTPUT_BITRATES[_OUTPUT_FORMAT]
+        logger.debug("Audio duration: %.2f seconds", duration)
         
-        # Calculate duration using mutagen
-        try:
-            audio_file = io.BytesIO(audio_data)
-            audio = MP3(audio_file)
-            duration = audio.info.length
-            print(f"[TTS] Audio duration: {duration:.2f} seconds")
-        except Exception as e:
-            print(f"[TTS] Warning: Could not calculate duration: {e}")
-            # Rough estimate: ~150 words per minute
-            word_count = len(script.split())
-            duration = (word_count / 150) * 60
-            print(f"[TTS] Using estimated duration: {duration:.2f} seconds")
+        if settings.DEBUG:
+            # Cross-check the CBR estimate against a full frame parse; only
+            # debug runs pay for importing mutagen
+            from mutagen.mp3 import MP3
+            try:
+                measured = MP3(output_path or io.BytesIO(audio_data)).info.length
+                logger.debug("Audio duration (mutagen): %.2f seconds", measured)
+            except Exception as e:
+                logger.warning("Could not parse generated MP3: %s", e)
         
         return {
             "audio_data": audio_data,
@@ -74,7 +180,7 @@ def text_to_speech(script: str, voice: str = "iLzHtPh0bW6RGWRG0Xo5") -> dict:
         
     except Exception as e:
         error_msg = f"TTS conversion failed: {str(e)}"
-        print(f"[ERROR] {error_msg}")
+        logger.exception(error_msg)
         return {
             "audio_data": b"",
             "duration": 0,
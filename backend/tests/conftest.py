@@ -1,14 +1,107 @@
 """
 Pytest fixtures for API testing.
 """
+from types import SimpleNamespace
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--integration", action="store_true", default=False,
+        help="Also run tests that call real external services (LLM, TTS)"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "integration: calls real external services; skipped unless --integration")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--integration"):
+        return
+    skip = pytest.mark.skip(reason="integration test, run with --integration")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip)
+
+
+class FakeQuery:
+    """
+    Stand-in for a postgrest query builder.
+    Every builder method returns self and is recorded in `calls`;
+    execute() returns the canned response set with set_response().
+    """
+    _BUILDER_METHODS = (
+        "select", "insert", "update", "upsert", "delete",
+        "eq", "neq", "lt", "lte", "gt", "gte", "in_", "is_",
+        "order", "range", "limit", "single", "maybe_single"
+    )
+    
+    def __init__(self):
+        self.calls: list[tuple[str, tuple, dict]] = []
+        self._data = None
+        self._count = None
+        self._error = None
+    
+    def __getattr__(self, name):
+        if name not in self._BUILDER_METHODS:
+            raise AttributeError(name)
+        
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+    
+    def set_response(self, data, count=None):
+        self._data = data
+        self._count = count
+        return self
+    
+    def set_error(self, exc: Exception):
+        self._error = exc
+        return self
+    
+    def args_for(self, name: str) -> list[tuple]:
+        """Positional args of every recorded call to `name`."""
+        return [args for method, args, _ in self.calls if method == name]
+    
+    def execute(self):
+        self.calls.append(("execute", (), {}))
+        if self._error is not None:
+            raise self._error
+        return SimpleNamespace(data=self._data, count=self._count)
+
+
+class FakeSupabase:
+    """
+    Fake supabase Client: one FakeQuery per table / RPC name, reused for
+    every call in a test. Anything else (storage, auth) falls through to a
+    MagicMock.
+    """
+    
+    def __init__(self):
+        self._tables: dict[str, FakeQuery] = {}
+        self._rpcs: dict[str, FakeQuery] = {}
+        self._fallback = MagicMock()
+    
+    def table(self, name: str) -> FakeQuery:
+        return self._tables.setdefault(name, FakeQuery())
+    
+    def rpc(self, name: str, params: dict | None = None) -> FakeQuery:
+        query = self._rpcs.setdefault(name, FakeQuery())
+        if params is not None:
+            query.calls.append(("rpc", (params,), {}))
+        return query
+    
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
 # Mock settings before importing app
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def mock_settings():
-    """Mock settings for all tests."""
+    """Mock settings for the whole session; nothing mutates them."""
     with patch("config.get_settings") as mock:
         mock.return_value = MagicMock(
             SUPABASE_URL="https://test.supabase.co",
@@ -26,26 +119,38 @@ def mock_supabase():
     from services.database import get_supabase_client
     get_supabase_client.cache_clear()
     
-    # Create a mock client
-    mock_client = MagicMock()
+    mock_client = FakeSupabase()
     
     # Patch in all the places where it's used
     with patch("services.database.get_supabase_client", return_value=mock_client):
-        with patch("routes.clips.get_supabase_client", return_value=mock_client):
-            with patch("routes.playback.get_supabase_client", return_value=mock_client):
-                # Also patch create_client to prevent any real client creation
-                with patch("supabase.create_client"):
-                    yield mock_client
+        # Also patch create_client to prevent any real client creation
+        with patch("supabase.create_client"):
+            yield mock_client
 
 
-@pytest.fixture
-def client(mock_settings, mock_supabase):
-    """Test client with mocked dependencies."""
+@pytest.fixture(scope="session")
+def app_instance(mock_settings):
+    """The FastAPI app, imported once per session."""
     from main import app
-    return TestClient(app)
+    return app
+
+
+@pytest.fixture(scope="session")
+def session_client(app_instance):
+    """One TestClient shared by every test; per-test state lives in dependency_overrides."""
+    return TestClient(app_instance)
 
 
 @pytest.fixture
+def client(app_instance, session_client, mock_supabase):
+    """Test client with mocked dependencies."""
+    from services.database import get_db
+    app_instance.dependency_overrides[get_db] = lambda: mock_supabase
+    yield session_client
+    app_instance.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
 def test_user():
     """Test user data."""
     return {
@@ -54,9 +159,9 @@ def test_user():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_token(test_user):
-    """Generate a valid JWT for testing."""
+    """Generate a valid JWT for testing, signed once per session."""
     import jwt
     return jwt.encode(
         {"sub": test_user["id"], "email": test_user["email"], "aud": "authenticated"},
@@ -65,7 +170,7 @@ def valid_token(test_user):
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def auth_headers(valid_token):
     """Authorization headers for authenticated requests."""
     return {"Authorization": f"Bearer {valid_token}"}
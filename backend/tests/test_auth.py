@@ -0,0 +1,61 @@
+"""
+Unit tests for JWT verification.
+"""
+import time
+from unittest.mock import patch
+import jwt
+import pytest
+from fastapi import HTTPException
+from services.auth import verify_token, _token_cache, _cache_key, _jwt
+
+SECRET = "test-secret-at-least-32-characters-long"
+
+
+def _token(**claims):
+    return jwt.encode(
+        {"sub": "test-user-123", "aud": "authenticated", **claims},
+        SECRET,
+        algorithm="HS256"
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    _token_cache.clear()
+    yield
+    _token_cache.clear()
+
+
+def test_verified_token_is_cached():
+    """Repeat calls with the same token should skip re-verification."""
+    token = _token(exp=int(time.time()) + 3600)
+    
+    with patch.object(_jwt, "decode", wraps=_jwt.decode) as decode:
+        first = verify_token(token)
+        second = verify_token(token)
+    
+    assert first == second
+    assert decode.call_count == 1
+
+
+def test_expired_cache_entry_is_reverified():
+    """A cached payload past its exp should not be served."""
+    token = _token(exp=int(time.time()) + 3600)
+    verify_token(token)
+    key = _cache_key(token)
+    _token_cache[key] = (_token_cache[key][0], time.time() - 1)
+    
+    with patch.object(_jwt, "decode", side_effect=jwt.ExpiredSignatureError):
+        with pytest.raises(HTTPException) as exc:
+            verify_token(token)
+    
+    assert exc.value.status_code == 401
+
+
+def test_cache_ttl_is_capped():
+    """Long-lived tokens should still be re-verified after the TTL cap."""
+    token = _token(exp=int(time.time()) + 86400)
+    verify_token(token)
+    
+    _, expires_at = _token_cache[_cache_key(token)]
+    assert expires_at <= time.time() + 300
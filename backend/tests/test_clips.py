@@ -1,7 +1,17 @@
 """
 Unit tests for clips endpoints.
 """
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+import pytest
+from models.responses import ClipResponse
+
+
+@pytest.fixture
+def production_settings():
+    """Production defaults: DEBUG off, response validation skipped."""
+    settings = MagicMock(DEBUG=False, SKIP_RESPONSE_VALIDATION=True)
+    with patch("routes.clips.get_settings", return_value=settings):
+        yield settings
 
 
 class TestCreateClip:
@@ -9,10 +19,7 @@ class TestCreateClip:
     
     def test_create_clip_success(self, client, auth_headers, mock_supabase, sample_clip):
         """Should create clip with valid input."""
-        # Mock DB insert
-        mock_supabase.table.return_value.insert.return_value.execute.return_value = MagicMock(
-            data=[sample_clip]
-        )
+        mock_supabase.table("audio_clips").set_response([sample_clip])
         
         response = client.post(
             "/api/v1/clips",
@@ -27,6 +34,45 @@ class TestCreateClip:
         assert response.status_code == 201
         assert response.json()["status"] == "pending"
     
+    def test_create_clip_matches_model_without_validation(
+        self, client, auth_headers, mock_supabase, sample_clip, production_settings
+    ):
+        """Unvalidated bodies should still only carry ClipResponse's fields."""
+        row = {**sample_clip, "started_processing_at": None, "generated_script": None}
+        mock_supabase.table("audio_clips").set_response([row])
+        
+        response = client.post(
+            "/api/v1/clips",
+            headers=auth_headers,
+            json={
+                "input_type": "url",
+                "input_content": "https://example.com/article",
+                "target_duration": 5
+            }
+        )
+        
+        assert response.status_code == 201
+        assert set(response.json()) == set(ClipResponse.model_fields)
+        assert "user_id" not in response.json()
+    
+    def test_create_clip_strips_content(self, client, auth_headers, mock_supabase, sample_clip):
+        """Should store input content without surrounding whitespace."""
+        mock_supabase.table("audio_clips").set_response([sample_clip])
+        
+        response = client.post(
+            "/api/v1/clips",
+            headers=auth_headers,
+            json={
+                "input_type": "note",
+                "input_content": "  What is entropy?\n",
+                "target_duration": 2
+            }
+        )
+        
+        assert response.status_code == 201
+        inserted = mock_supabase.table("audio_clips").args_for("insert")[0][0]
+        assert inserted["input_content"] == "What is entropy?"
+    
     def test_create_clip_invalid_duration(self, client, auth_headers):
         """Should reject invalid duration values."""
         response = client.post(
@@ -53,6 +99,12 @@ class TestCreateClip:
         )
         
         assert response.status_code in [401, 403]
+    
+    def test_create_clip_auth_before_validation(self, client):
+        """Unauthenticated requests should be rejected before the body is validated."""
+        response = client.post("/api/v1/clips", json={"target_duration": 7})
+        
+        assert response.status_code in [401, 403]
 
 
 class TestListClips:
@@ -60,10 +112,7 @@ class TestListClips:
     
     def test_list_clips_empty(self, client, auth_headers, mock_supabase):
         """Should return empty list when no clips."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .order.return_value.range.return_value.execute.return_value = MagicMock(
-                data=[], count=0
-            )
+        mock_supabase.table("audio_clips").set_response([], count=0)
         
         response = client.get("/api/v1/clips", headers=auth_headers)
         
@@ -73,15 +122,25 @@ class TestListClips:
     
     def test_list_clips_with_data(self, client, auth_headers, mock_supabase, sample_clip):
         """Should return user's clips."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .order.return_value.range.return_value.execute.return_value = MagicMock(
-                data=[sample_clip], count=1
-            )
+        mock_supabase.table("audio_clips").set_response([sample_clip], count=1)
         
         response = client.get("/api/v1/clips", headers=auth_headers)
         
         assert response.status_code == 200
         assert len(response.json()["clips"]) == 1
+    
+    def test_list_clips_before_cursor(self, client, auth_headers, mock_supabase, sample_clip):
+        """Should filter on created_at when a keyset cursor is given."""
+        query = mock_supabase.table("audio_clips").set_response([sample_clip], count=1)
+        
+        response = client.get(
+            "/api/v1/clips",
+            headers=auth_headers,
+            params={"before": "2024-01-01T00:00:00+00:00"}
+        )
+        
+        assert response.status_code == 200
+        assert query.args_for("lt") == [("created_at", "2024-01-01T00:00:00+00:00")]
 
 
 class TestGetClip:
@@ -89,10 +148,7 @@ class TestGetClip:
     
     def test_get_clip_success(self, client, auth_headers, mock_supabase, sample_clip):
         """Should return clip details."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data=sample_clip
-            )
+        mock_supabase.table("audio_clips").set_response(sample_clip)
         
         response = client.get("/api/v1/clips/clip-123", headers=auth_headers)
         
@@ -101,10 +157,7 @@ class TestGetClip:
     
     def test_get_clip_not_found(self, client, auth_headers, mock_supabase):
         """Should return 404 for non-existent clip."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data=None
-            )
+        mock_supabase.table("audio_clips").set_response(None)
         
         response = client.get("/api/v1/clips/nonexistent", headers=auth_headers)
         
@@ -116,22 +169,36 @@ class TestToggleFavorite:
     
     def test_toggle_favorite_on(self, client, auth_headers, mock_supabase, sample_clip):
         """Should toggle favorite from false to true."""
-        # First call returns current state
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"is_favorited": False}
-            )
-        # Second call updates
         favorited_clip = {**sample_clip, "is_favorited": True}
-        mock_supabase.table.return_value.update.return_value.eq.return_value\
-            .eq.return_value.execute.return_value = MagicMock(
-                data=[favorited_clip]
-            )
+        mock_supabase.rpc("toggle_clip_favorite").set_response([favorited_clip])
         
         response = client.patch("/api/v1/clips/clip-123/favorite", headers=auth_headers)
         
         assert response.status_code == 200
         assert response.json()["is_favorited"] is True
+    
+    def test_toggle_favorite_matches_model_without_validation(
+        self, client, auth_headers, mock_supabase, sample_clip, production_settings
+    ):
+        """The rpc returns the whole row; the body should not."""
+        row = {
+            **sample_clip, "is_favorited": True,
+            "started_processing_at": None, "generated_script": "Script."
+        }
+        mock_supabase.rpc("toggle_clip_favorite").set_response([row])
+        
+        response = client.patch("/api/v1/clips/clip-123/favorite", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json() == ClipResponse.model_validate(row).model_dump(mode="json")
+    
+    def test_toggle_favorite_not_found(self, client, auth_headers, mock_supabase):
+        """Should return 404 when the clip isn't the user's."""
+        mock_supabase.rpc("toggle_clip_favorite").set_response([])
+        
+        response = client.patch("/api/v1/clips/nonexistent/favorite", headers=auth_headers)
+        
+        assert response.status_code == 404
 
 
 class TestDeleteClip:
@@ -139,16 +206,21 @@ class TestDeleteClip:
     
     def test_delete_clip_success(self, client, auth_headers, mock_supabase):
         """Should delete clip successfully."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"audio_url": None}
-            )
-        mock_supabase.table.return_value.delete.return_value.eq.return_value\
-            .eq.return_value.execute.return_value = MagicMock()
+        mock_supabase.table("audio_clips").set_response({"audio_url": None})
         
         response = client.delete("/api/v1/clips/clip-123", headers=auth_headers)
         
         assert response.status_code == 200
         assert "deleted" in response.json()["message"].lower()
 
-
+    def test_delete_clip_storage_failure(self, client, auth_headers, mock_supabase):
+        """Should still delete the row when audio removal fails."""
+        mock_supabase.table("audio_clips").set_response(
+            {"audio_url": "https://test.supabase.co/audio.mp3"}
+        )
+        mock_supabase.storage.from_.return_value.remove.side_effect = Exception("boom")
+        
+        response = client.delete("/api/v1/clips/clip-123", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert mock_supabase.table("audio_clips").args_for("delete") == [()]
@@ -0,0 +1,72 @@
+"""
+Unit tests for audio spooling in the processing graph.
+"""
+import os
+import tempfile
+from unittest.mock import patch
+import pytest
+from services.graph.nodes import text_to_speech_node
+import processor
+
+
+def _write_audio(script, output_path=None):
+    with open(output_path, "wb") as f:
+        f.write(b"mp3")
+    return {"audio_data": b"", "duration": 1.0, "error": None}
+
+
+def test_tts_spools_to_unique_temp_file():
+    """Runs of the same clip should never share a spool file."""
+    with patch("services.tts_service.text_to_speech", side_effect=_write_audio):
+        first = text_to_speech_node({"clip_id": "clip-1", "script": "Hello."})
+        second = text_to_speech_node({"clip_id": "clip-1", "script": "Hello."})
+    
+    try:
+        assert first["audio_path"] != second["audio_path"]
+        for state in (first, second):
+            assert os.path.dirname(state["audio_path"]) == tempfile.gettempdir()
+            assert os.path.basename(state["audio_path"]).startswith("echo-clip-1-")
+    finally:
+        os.remove(first["audio_path"])
+        os.remove(second["audio_path"])
+
+
+def test_tts_failure_removes_spool_file():
+    """A failed or raising TTS call shouldn't leave its spool file behind."""
+    paths = []
+    
+    def fail(script, output_path=None):
+        paths.append(output_path)
+        return {"audio_data": b"", "duration": 0, "error": "quota exceeded"}
+    
+    def crash(script, output_path=None):
+        paths.append(output_path)
+        raise RuntimeError("boom")
+    
+    with patch("services.tts_service.text_to_speech", side_effect=fail):
+        state = text_to_speech_node({"clip_id": "clip-1", "script": "Hello."})
+    with patch("services.tts_service.text_to_speech", side_effect=crash):
+        with pytest.raises(RuntimeError):
+            text_to_speech_node({"clip_id": "clip-1", "script": "Hello."})
+    
+    assert state["error"] == "quota exceeded"
+    assert "audio_path" not in state
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_process_clip_removes_spool_file_when_graph_raises(mock_supabase):
+    """Audio spooled before the graph fails should be removed by process_clip."""
+    fd, audio_path = tempfile.mkstemp(suffix=".mp3", prefix="echo-clip-1-")
+    os.close(fd)
+    clip = {"input_type": "note", "input_content": "Hello.", "target_duration": 2}
+    
+    def stream(state, stream_mode):
+        yield {**state, "audio_path": audio_path}
+        raise RuntimeError("graph failed")
+    
+    with patch("processor.get_supabase_client", return_value=mock_supabase), \
+            patch.object(processor.processing_graph, "stream", side_effect=stream):
+        result = processor.process_clip("clip-1", clip)
+    
+    assert result == {"success": False, "error": "graph failed"}
+    assert not os.path.exists(audio_path)
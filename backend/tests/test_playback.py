@@ -1,7 +1,6 @@
 """
 Unit tests for playback progress endpoints.
 """
-from unittest.mock import MagicMock
 
 
 class TestGetProgress:
@@ -9,21 +8,15 @@ class TestGetProgress:
     
     def test_get_progress_exists(self, client, auth_headers, mock_supabase):
         """Should return existing progress."""
-        # Clip exists
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"id": "clip-123"}
-            )
-        # Progress exists
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(
-                data={
-                    "clip_id": "clip-123",
-                    "position_seconds": 120,
-                    "has_completed": False,
-                    "last_played_at": "2024-01-01T00:00:00Z"
-                }
-            )
+        # Clip exists with embedded progress
+        mock_supabase.table("audio_clips").set_response({
+            "id": "clip-123",
+            "playback_progress": [{
+                "position_seconds": 120,
+                "has_completed": False,
+                "last_played_at": "2024-01-01T00:00:00Z"
+            }]
+        })
         
         response = client.get("/api/v1/clips/clip-123/progress", headers=auth_headers)
         
@@ -32,16 +25,10 @@ class TestGetProgress:
     
     def test_get_progress_not_started(self, client, auth_headers, mock_supabase):
         """Should return defaults when no progress exists."""
-        # Clip exists
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"id": "clip-123"}
-            )
-        # No progress yet
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.maybe_single.return_value.execute.return_value = MagicMock(
-                data=None
-            )
+        # Clip exists, no progress yet
+        mock_supabase.table("audio_clips").set_response(
+            {"id": "clip-123", "playback_progress": []}
+        )
         
         response = client.get("/api/v1/clips/clip-123/progress", headers=auth_headers)
         
@@ -51,10 +38,7 @@ class TestGetProgress:
     
     def test_get_progress_clip_not_found(self, client, auth_headers, mock_supabase):
         """Should return 404 when clip doesn't exist."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data=None
-            )
+        mock_supabase.table("audio_clips").set_response(None)
         
         response = client.get("/api/v1/clips/nonexistent/progress", headers=auth_headers)
         
@@ -66,20 +50,13 @@ class TestUpdateProgress:
     
     def test_update_progress_success(self, client, auth_headers, mock_supabase):
         """Should upsert progress successfully."""
-        # Clip exists
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"id": "clip-123"}
-            )
-        # Upsert returns updated data
-        mock_supabase.table.return_value.upsert.return_value.execute.return_value = MagicMock(
-            data=[{
-                "clip_id": "clip-123",
-                "position_seconds": 180,
-                "has_completed": False,
-                "last_played_at": "2024-01-01T00:00:00Z"
-            }]
-        )
+        # Upsert RPC returns updated data
+        mock_supabase.rpc("upsert_playback_progress").set_response([{
+            "clip_id": "clip-123",
+            "position_seconds": 180,
+            "has_completed": False,
+            "last_played_at": "2024-01-01T00:00:00Z"
+        }])
         
         response = client.put(
             "/api/v1/clips/clip-123/progress",
@@ -92,18 +69,12 @@ class TestUpdateProgress:
     
     def test_update_progress_mark_completed(self, client, auth_headers, mock_supabase):
         """Should mark clip as completed."""
-        mock_supabase.table.return_value.select.return_value.eq.return_value\
-            .eq.return_value.single.return_value.execute.return_value = MagicMock(
-                data={"id": "clip-123"}
-            )
-        mock_supabase.table.return_value.upsert.return_value.execute.return_value = MagicMock(
-            data=[{
-                "clip_id": "clip-123",
-                "position_seconds": 300,
-                "has_completed": True,
-                "last_played_at": "2024-01-01T00:00:00Z"
-            }]
-        )
+        mock_supabase.rpc("upsert_playback_progress").set_response([{
+            "clip_id": "clip-123",
+            "position_seconds": 300,
+            "has_completed": True,
+            "last_played_at": "2024-01-01T00:00:00Z"
+        }])
         
         response = client.put(
             "/api/v1/clips/clip-123/progress",
@@ -114,6 +85,18 @@ class TestUpdateProgress:
         assert response.status_code == 200
         assert response.json()["has_completed"] is True
     
+    def test_update_progress_clip_not_found(self, client, auth_headers, mock_supabase):
+        """Should return 404 when the clip isn't the user's."""
+        mock_supabase.rpc("upsert_playback_progress").set_response([])
+        
+        response = client.put(
+            "/api/v1/clips/nonexistent/progress",
+            headers=auth_headers,
+            json={"position_seconds": 10, "has_completed": False}
+        )
+        
+        assert response.status_code == 404
+    
     def test_update_progress_invalid_position(self, client, auth_headers):
         """Should reject negative position."""
         response = client.put(
@@ -123,5 +106,12 @@ class TestUpdateProgress:
         )
         
         assert response.status_code == 422
-
-
+    
+    def test_update_progress_auth_before_validation(self, client):
+        """Unauthenticated requests should be rejected before the body is validated."""
+        response = client.put(
+            "/api/v1/clips/clip-123/progress",
+            json={"position_seconds": -10}
+        )
+        
+        assert response.status_code in [401, 403]
@@ -0,0 +1,45 @@
+"""
+Unit tests for URL scraping.
+"""
+from unittest.mock import patch
+import httpx
+import pytest
+from services import scraper
+
+ARTICLE_HTML = (
+    "<html><head><title>Entropy</title></head><body><nav>Home | About</nav>"
+    "<article><h1>Entropy</h1><p>"
+    + "Entropy measures how many microstates match a macrostate. " * 20
+    + "</p></article></body></html>"
+)
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/missing":
+        return httpx.Response(404)
+    return httpx.Response(200, text=ARTICLE_HTML, headers={"content-type": "text/html"})
+
+
+@pytest.fixture
+def mock_http():
+    client = httpx.Client(transport=httpx.MockTransport(_handler), follow_redirects=True)
+    with patch.object(scraper, "_get_client", return_value=client):
+        yield
+
+
+def test_scrape_url_extracts_content_and_title(mock_http):
+    """Should return the article text and title without page chrome."""
+    result = scraper.scrape_url("https://example.com/article")
+
+    assert result["error"] is None
+    assert "microstates" in result["content"]
+    assert "Home | About" not in result["content"]
+    assert result["title"] == "Entropy"
+
+
+def test_scrape_url_http_error(mock_http):
+    """Should report HTTP failures in the error field."""
+    result = scraper.scrape_url("https://example.com/missing")
+
+    assert result["content"] == ""
+    assert "404" in result["error"]
@@ -6,16 +6,19 @@ without running the full pipeline.
 
 Usage:
     python test_script_generation.py
+    pytest tests/test_script_generation.py --integration
 """
 import sys
 from pathlib import Path
+import pytest
 
 # Add parent directory to path so we can import from services
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.graph.nodes import generate_script_node
+from services.graph.nodes import process_note_node, generate_script_node
 
 
+@pytest.mark.integration
 def test_note_script_generation():
     """Test script generation with a sample note."""
     
@@ -28,8 +31,7 @@ def test_note_script_generation():
                 "input_type": "note",
                 "input_content": "Explain the concept of entropy to me like I'm 5",
                 "target_duration": 2,
-                "context_instruction": None,
-                "extracted_content": "Explain the concept of entropy to me like I'm 5"
+                "context_instruction": None
             }
         },
         {
@@ -39,8 +41,7 @@ def test_note_script_generation():
                 "input_type": "note",
                 "input_content": "Explain how async/await works in Python and when to use it",
                 "target_duration": 5,
-                "context_instruction": "Focus on practical examples and common pitfalls",
-                "extracted_content": "Explain how async/await works in Python and when to use it"
+                "context_instruction": "Focus on practical examples and common pitfalls"
             }
         },
         {
@@ -50,8 +51,7 @@ def test_note_script_generation():
                 "input_type": "note",
                 "input_content": "What are the key principles of value investing and how do they differ from growth investing?",
                 "target_duration": 10,
-                "context_instruction": None,
-                "extracted_content": "What are the key principles of value investing and how do they differ from growth investing?"
+                "context_instruction": None
             }
         }
     ]
@@ -62,7 +62,8 @@ def test_note_script_generation():
         print(f"TEST: {test_case['name']}")
         print("="*80)
         
-        result = generate_script_node(test_case["state"])
+        # Same path as the graph: the note node fills extracted_content
+        result = generate_script_node(process_note_node(test_case["state"]))
         
         if result.get("error"):
             print(f"\n❌ ERROR: {result['error']}")
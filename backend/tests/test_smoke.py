@@ -32,3 +32,24 @@ def test_unauthenticated_request_rejected(client):
     assert response.status_code in [401, 403]
 
 
+def test_cors_preflight(client):
+    """Preflight requests should be answered with CORS headers."""
+    response = client.options(
+        "/api/v1/clips",
+        headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "authorization,content-type",
+        },
+    )
+    assert response.status_code == 204
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert "POST" in response.headers["access-control-allow-methods"]
+    assert response.headers["access-control-allow-headers"] == "authorization,content-type"
+
+
+def test_cors_headers_on_response(client):
+    """Cross-origin responses should carry the allow-origin header."""
+    response = client.get("/", headers={"Origin": "https://example.com"})
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
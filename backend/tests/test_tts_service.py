@@ -0,0 +1,33 @@
+"""
+Unit tests for TTS script chunking.
+"""
+from unittest.mock import MagicMock
+from services import tts_service
+from services.tts_service import chunk_script
+
+
+def test_chunk_script_splits_on_sentences():
+    """Chunks should stay under the limit and rejoin to the original script."""
+    script = "Entropy counts microstates. " * 200
+    
+    chunks = chunk_script(script, max_chars=500)
+    
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == script.strip()
+
+
+def test_convert_chunks_keeps_script_order():
+    """Audio should come back in script order with neighbouring text as context."""
+    client = MagicMock()
+    client.text_to_speech.convert.side_effect = lambda text, **kwargs: [text.encode()]
+    chunks = ["One.", "Two.", "Three."]
+    
+    audio = list(tts_service._convert_chunks(client, chunks, voice="voice"))
+    
+    assert audio == [b"One.", b"Two.", b"Three."]
+    calls = {c.kwargs["text"]: c.kwargs for c in client.text_to_speech.convert.call_args_list}
+    assert calls["Two."]["previous_text"] == "One."
+    assert calls["Two."]["next_text"] == "Three."
+    assert calls["One."]["previous_text"] is None
@@ -0,0 +1,256 @@
+"""
+Unit tests for the background worker loop.
+"""
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pytest
+from prometheus_client import REGISTRY
+from worker import (
+    CLAIM_COLUMNS, LISTEN_CONNECT_TIMEOUT, run_worker, _claim_clips, _listen_connection, _wait_for_work
+)
+
+
+def _clip(clip_id: str) -> dict:
+    return {
+        "id": clip_id,
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "input_type": "note",
+        "input_content": "What is entropy?",
+        "target_duration": 2,
+        "context_instruction": None
+    }
+
+
+@pytest.fixture
+def worker_env(mock_supabase):
+    """
+    Patch run_worker's dependencies. The returned namespace exposes
+    `waits` (every stop.wait() timeout) and `stop_after` (stop once that
+    many waits have happened).
+    """
+    env = SimpleNamespace(
+        waits=[], stop_after=1,
+        settings=MagicMock(
+            WORKER_CONCURRENCY=3, WORKER_METRICS_PORT=0, WORKER_STALE_CLIP_MINUTES=30,
+            SUPABASE_DB_URL=None
+        )
+    )
+    
+    def install(stop):
+        # Record backoff / poll waits instead of sleeping through them
+        def wait(timeout=None):
+            env.waits.append(timeout)
+            if len(env.waits) >= env.stop_after:
+                stop.set()
+            return stop.is_set()
+        stop.wait = wait
+    
+    with patch("worker.get_settings", return_value=env.settings), \
+            patch("worker.get_supabase_client", return_value=mock_supabase), \
+            patch("worker.close_supabase_client"), \
+            patch("worker.start_metrics_server"), \
+            patch("worker._install_signal_handlers", side_effect=install), \
+            patch("worker.random.uniform", return_value=0):
+        yield env
+
+
+class TestClaimClips:
+    """Tests for _claim_clips"""
+    
+    def test_claim_projects_columns(self, mock_supabase):
+        """Should claim through the RPC and fetch only the columns the worker reads."""
+        claim = mock_supabase.rpc("claim_pending_clips").set_response([_clip("a")])
+        
+        claimed = _claim_clips(mock_supabase, 3, with_depth=False)
+        
+        assert [clip["id"] for clip in claimed] == ["a"]
+        assert claim.args_for("rpc") == [({"p_limit": 3},)]
+        assert claim.args_for("select") == [(CLAIM_COLUMNS,)]
+    
+    def test_claim_empty_queue(self, mock_supabase):
+        """Should return an empty list when nothing is pending."""
+        mock_supabase.rpc("claim_pending_clips").set_response([])
+        
+        assert _claim_clips(mock_supabase, 3, with_depth=False) == []
+    
+    def test_claim_with_depth_sets_gauge(self, mock_supabase):
+        """Should record the remaining queue depth from the same call."""
+        mock_supabase.rpc("claim_pending_clips_with_depth").set_response(
+            [{"pending_depth": 7, "claimed": [_clip("a")]}]
+        )
+        
+        claimed = _claim_clips(mock_supabase, 2, with_depth=True)
+        
+        assert [clip["id"] for clip in claimed] == ["a"]
+        assert REGISTRY.get_sample_value("worker_pending_clips") == 7
+
+
+class TestListenConnection:
+    """Tests for _listen_connection"""
+    
+    def test_connect_is_bounded(self):
+        """The LISTEN connect should time out instead of hanging on a bad DSN."""
+        settings = MagicMock(SUPABASE_DB_URL="postgresql://db.invalid/postgres")
+        
+        with patch("worker.get_settings", return_value=settings), \
+                patch("psycopg.connect", side_effect=OSError("unreachable")) as connect:
+            assert _listen_connection() is None
+        
+        assert connect.call_args.kwargs["connect_timeout"] == LISTEN_CONNECT_TIMEOUT
+
+
+class TestWaitForWork:
+    """Tests for _wait_for_work"""
+    
+    def test_without_listener_waits_on_stop(self):
+        """Without LISTEN it should sleep on the stop event and stay disconnected."""
+        stop = threading.Event()
+        
+        start = time.monotonic()
+        assert _wait_for_work(None, 0.05, stop) is None
+        assert time.monotonic() - start >= 0.05
+    
+    def test_without_listener_returns_on_stop(self):
+        """A stop request should end the wait immediately."""
+        stop = threading.Event()
+        stop.set()
+        
+        start = time.monotonic()
+        assert _wait_for_work(None, 30, stop) is None
+        assert time.monotonic() - start < 1
+
+
+class TestRunWorker:
+    """Tests for the run_worker loop"""
+    
+    def test_failures_back_off_and_reset(self, worker_env):
+        """Failed polls should back off exponentially up to the cap, then reset on success."""
+        worker_env.stop_after = 5
+        errors_before = REGISTRY.get_sample_value("worker_db_poll_errors_total")
+        claims = [RuntimeError("db down")] * 4 + [[]]
+        
+        with patch("worker._claim_clips", side_effect=claims):
+            run_worker(interval=1, max_interval=5)
+        
+        # 2, 4, then capped at 5; the empty poll after recovery waits `interval`
+        assert worker_env.waits == [2, 4, 5, 5, 1]
+        assert REGISTRY.get_sample_value("worker_db_poll_errors_total") - errors_before == 4
+    
+    def test_claims_only_free_slots_and_drains_on_stop(self, worker_env):
+        """Should claim up to the free pool slots and finish in-flight clips before exiting."""
+        release = threading.Event()
+        finished = []
+        limits = []
+        
+        def claim(supabase, limit, with_depth):
+            limits.append(limit)
+            return [_clip("a")] if len(limits) == 1 else []
+        
+        def process(clip_id, clip):
+            release.wait(5)
+            time.sleep(0.05)
+            finished.append(clip_id)
+            return {"success": True}
+        
+        def install(stop):
+            # The first empty poll stops the worker while "a" is still running
+            def wait(timeout=None):
+                worker_env.waits.append(timeout)
+                stop.set()
+                release.set()
+                return True
+            stop.wait = wait
+        
+        with patch("worker._claim_clips", side_effect=claim), \
+                patch("worker._process_clip_timed", side_effect=process), \
+                patch("worker._install_signal_handlers", side_effect=install):
+            run_worker(interval=1)
+        
+        assert limits == [3, 2]
+        assert finished == ["a"]
+    
+    def test_crashed_clip_marked_failed(self, worker_env, mock_supabase):
+        """Exceptions escaping process_clip should be logged and fail the clip."""
+        claims = [[_clip("a")], []]
+        
+        with patch("worker._claim_clips", side_effect=claims), \
+                patch("worker._process_clip_timed", side_effect=ImportError("no processor")):
+            run_worker(interval=1)
+        
+        update = mock_supabase.table("audio_clips")
+        assert update.args_for("update") == [({"status": "failed", "error_message": "no processor"},)]
+        assert update.args_for("eq") == [("id", "a")]
+    
+    def test_bad_timestamp_still_dispatches(self, worker_env):
+        """A clip whose dispatch latency can't be measured should still be processed."""
+        clip = {**_clip("a"), "created_at": "not a timestamp"}
+        
+        with patch("worker._claim_clips", side_effect=[[clip], []]), \
+                patch("worker._process_clip_timed", return_value={"success": True}) as process:
+            run_worker(interval=1)
+        
+        process.assert_called_once_with("a", clip)
+    
+    def test_failed_dispatch_releases_unsubmitted(self, worker_env, mock_supabase):
+        """Clips claimed but never submitted should go back to pending."""
+        claims = [[_clip("a"), _clip("b")], []]
+        
+        with patch("worker._claim_clips", side_effect=claims), \
+                patch("worker._process_clip_timed", return_value={"success": True}), \
+                patch("worker._observe_dispatch_latency", side_effect=[None, RuntimeError("boom")]):
+            worker_env.stop_after = 2
+            run_worker(interval=1)
+        
+        release = mock_supabase.table("audio_clips")
+        assert release.args_for("update") == [({"status": "pending"},)]
+        assert release.args_for("in_") == [("id", ["b"])]
+    
+    def test_stale_clips_requeued_periodically(self, worker_env, mock_supabase):
+        """The stale-clip sweep should keep running after startup."""
+        worker_env.stop_after = 3
+        
+        with patch("worker._claim_clips", return_value=[]), \
+                patch("worker.STALE_SWEEP_SECONDS", 0):
+            run_worker(interval=1)
+        
+        sweeps = mock_supabase.rpc("requeue_stale_clips").args_for("rpc")
+        assert len(sweeps) == 4
+        assert sweeps[0] == ({"p_timeout_minutes": 30},)
+    
+    def test_listen_reconnects_are_rate_limited(self, worker_env):
+        """A failing LISTEN connection shouldn't be retried on every claim."""
+        claims = [[_clip("a")], [_clip("b")], [_clip("c")], []]
+        
+        with patch("worker._claim_clips", side_effect=claims), \
+                patch("worker._process_clip_timed", return_value={"success": True}), \
+                patch("worker._listen_connection", return_value=None) as listen:
+            run_worker(interval=1)
+        
+        listen.assert_called_once()
+    
+    def test_inflight_clips_heartbeat(self, worker_env, mock_supabase):
+        """Running clips should be heartbeated so the stale sweep leaves them alone."""
+        release = threading.Event()
+        
+        def process(clip_id, clip):
+            release.wait(5)
+            return {"success": True}
+        
+        def install(stop):
+            # "a" is still running when the first empty poll stops the worker
+            def wait(timeout=None):
+                stop.set()
+                release.set()
+                return True
+            stop.wait = wait
+        
+        with patch("worker._claim_clips", side_effect=[[_clip("a")], []]), \
+                patch("worker._process_clip_timed", side_effect=process), \
+                patch("worker._install_signal_handlers", side_effect=install), \
+                patch("worker.HEARTBEAT_SECONDS", 0):
+            run_worker(interval=1)
+        
+        heartbeats = mock_supabase.rpc("heartbeat_clips").args_for("rpc")
+        assert heartbeats == [({"p_clip_ids": ["a"]},)]
@@ -1,65 +1,384 @@
 """
-Background worker - polls for pending clips and processes them.
+Background worker - claims pending clips and processes them.
 
-This is the main entry point for background processing.
-It continuously checks for pending clips and processes them.
+Clips are claimed with the claim_pending_clips RPC (migrations/009), which
+flips them to "processing" under SKIP LOCKED so several workers can share
+the queue. Claimed clips run on a thread pool sized by WORKER_CONCURRENCY,
+and the worker only claims as many as it has free slots.
 
-TODO: Implement polling loop
-- Check for pending clips
-- Process them one at a time (or parallel with rate limiting)
-- Handle graceful shutdown
-- Add retry logic
-- Add monitoring/logging
+When SUPABASE_DB_URL is set the worker LISTENs for new clips (migrations/008)
+and wakes up as soon as one is inserted; otherwise, and as a fallback for
+missed notifications, empty polls back off from `interval` to `max_interval`.
+Failed polls back off the same way. The worker heartbeats its in-flight
+clips, and requeue_stale_clips (on startup and every few minutes after)
+only requeues clips whose heartbeat has lapsed, i.e. whose worker died.
 
-For MVP, this can be run manually or as a simple daemon.
-Later, consider using Celery, RQ, or similar for production.
+SIGTERM/SIGINT stop claiming and drain the in-flight clips before exiting.
 """
+import logging
+import random
+import signal
+import threading
 import time
-from services.database import get_supabase_client
-from processor import process_clip
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional, TypedDict
+import httpx
+from config import get_settings
+from services.database import get_supabase_client, close_supabase_client
+from logging_config import setup_logging
+from metrics import (
+    DISPATCH_LATENCY, INFLIGHT_CLIPS, PENDING_CLIPS, POLL_ERRORS, PROCESS_DURATION,
+    start_metrics_server
+)
 
+logger = logging.getLogger(__name__)
 
-def run_worker(interval: int = 10):
+# Fed by the audio_clips_notify_pending trigger (migrations/008)
+NOTIFY_CHANNEL = "clips_pending"
+# Bound each LISTEN connect attempt, and space out retries (doubling up to
+# the max) so an unreachable SUPABASE_DB_URL doesn't stall claiming
+LISTEN_CONNECT_TIMEOUT = 5
+LISTEN_RETRY_SECONDS = 5
+LISTEN_RETRY_MAX_SECONDS = 300
+
+# How often the stale-clip sweep runs while the worker is up; the
+# staleness timeout itself is WORKER_STALE_CLIP_MINUTES (migrations/013)
+STALE_SWEEP_SECONDS = 300
+# How often in-flight clips' heartbeat_at is refreshed
+HEARTBEAT_SECONDS = 60
+
+# Exactly what the worker and process_clip read from a claimed clip
+# (processor._INPUT_COLUMNS plus id/created_at); keep migrations/012 in sync
+CLAIM_COLUMNS = "id,created_at,input_type,input_content,target_duration,context_instruction"
+
+
+class ClaimedClip(TypedDict):
+    """Row shape returned by the claim RPCs."""
+    id: str
+    created_at: str
+    input_type: str
+    input_content: str
+    target_duration: int
+    context_instruction: Optional[str]
+
+
+# Consecutive loop failures after which the worker reports its dependency
+# as down (once per outage)
+FAILURE_ALERT_THRESHOLD = 5
+
+
+def _listen_connection():
+    """
+    Open a dedicated Postgres connection LISTENing for new pending clips.
+    Returns None (plain polling) if SUPABASE_DB_URL isn't set, psycopg isn't
+    installed, or the connection fails.
+    """
+    dsn = get_settings().SUPABASE_DB_URL
+    if not dsn:
+        return None
+    
+    try:
+        import psycopg
+        conn = psycopg.connect(dsn, autocommit=True, connect_timeout=LISTEN_CONNECT_TIMEOUT)
+        conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    except Exception as e:
+        logger.warning("LISTEN unavailable, polling only: %s", e)
+        return None
+    
+    logger.info("Listening on %s", NOTIFY_CHANNEL)
+    return conn
+
+
+def _wait_for_work(conn, interval: float, stop: threading.Event):
+    """
+    Block until a clip is announced, `interval` seconds pass, or `stop` is set.
+    The timeout doubles as the fallback poll for notifications missed while
+    disconnected. Returns the connection to keep using, or None if it
+    dropped (the caller reconnects on the next cycle).
+    """
+    if conn is None:
+        stop.wait(interval)
+        return None
+    
+    deadline = time.monotonic() + interval
+    try:
+        # Wait in short slices so a shutdown request is noticed promptly
+        while not stop.is_set() and (remaining := deadline - time.monotonic()) > 0:
+            # The payload is just a wake-up; the pending query below decides
+            # what actually gets processed
+            for _ in conn.notifies(timeout=min(remaining, 1), stop_after=1):
+                return conn
+        return conn
+    except Exception as e:
+        logger.warning("LISTEN connection lost: %s", e)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        return None
+
+
+def _claim_clips(supabase, limit: int, with_depth: bool) -> list[ClaimedClip]:
+    """
+    Claim up to `limit` pending clips (migrations/009). With with_depth the
+    remaining queue depth comes back in the same call (migrations/011) and
+    is recorded for the pending-clips metric.
+    """
+    if not with_depth:
+        return supabase.rpc("claim_pending_clips", {"p_limit": limit})\
+            .select(CLAIM_COLUMNS)\
+            .execute().data or []
+    
+    result = supabase.rpc("claim_pending_clips_with_depth", {"p_limit": limit}).execute()
+    row = result.data[0] if result.data else {}
+    PENDING_CLIPS.set(row.get("pending_depth") or 0)
+    return row.get("claimed") or []
+
+
+def _requeue_stale_clips(supabase, timeout_minutes: int) -> None:
+    """Requeue clips orphaned in "processing"; failures are only logged."""
+    try:
+        requeued = supabase.rpc("requeue_stale_clips", {"p_timeout_minutes": timeout_minutes}).execute()
+        if requeued.data:
+            logger.warning("Requeued %d stale clips", len(requeued.data))
+    except Exception:
+        logger.exception("Failed to requeue stale clips")
+
+
+def _heartbeat(supabase, clip_ids: list[str]) -> None:
+    """
+    Mark in-flight clips as still owned so requeue_stale_clips leaves them
+    alone. Failures are only logged; a lapse has to outlast
+    WORKER_STALE_CLIP_MINUTES before it matters.
+    """
+    try:
+        supabase.rpc("heartbeat_clips", {"p_clip_ids": clip_ids}).execute()
+    except Exception as e:
+        logger.warning("Heartbeat failed for %d clips: %s", len(clip_ids), e)
+
+
+def _release_clips(supabase, clip_ids: list[str]) -> None:
+    """
+    Put claimed clips that never reached the pool back to "pending", so
+    they don't wait out WORKER_STALE_CLIP_MINUTES. Failures are only
+    logged; the stale sweep still catches them.
+    """
+    try:
+        supabase.table("audio_clips")\
+            .update({"status": "pending"})\
+            .in_("id", clip_ids)\
+            .eq("status", "processing")\
+            .execute()
+        logger.warning("Released %d claimed clips that were never dispatched", len(clip_ids))
+    except Exception:
+        logger.exception("Failed to release claimed clips %s", clip_ids)
+
+
+def _process_clip_timed(clip_id: str, clip: ClaimedClip) -> dict:
+    """process_clip, recording its duration by outcome."""
+    # Deferred: processor pulls in LangChain/LangGraph and the LLM SDKs
+    # (~1.5s to import), which the worker doesn't need until it has a clip
+    from processor import process_clip
+    
+    start = time.perf_counter()
+    result = process_clip(clip_id, clip)
+    outcome = "success" if result.get("success") else "failed"
+    PROCESS_DURATION.labels(outcome).observe(time.perf_counter() - start)
+    return result
+
+
+def _check_clip_result(supabase, clip_id: str, future: Future) -> None:
+    """
+    Done-callback for a dispatched clip. process_clip marks its own failures,
+    but anything escaping it (the processor import, its failure update)
+    would be swallowed by the future and leave the clip "processing".
+    """
+    if future.cancelled() or (exc := future.exception()) is None:
+        return
+    
+    logger.error("Clip %s crashed outside process_clip", clip_id, exc_info=exc)
+    try:
+        supabase.table("audio_clips").update({
+            "status": "failed",
+            "error_message": str(exc)
+        }).eq("id", clip_id).execute()
+    except Exception:
+        # Still "processing"; requeue_stale_clips picks it up later
+        logger.exception("Failed to mark clip %s as failed", clip_id)
+
+
+def _observe_dispatch_latency(clip: ClaimedClip) -> None:
+    """Record how long a claimed clip waited in the queue."""
+    created_at = clip.get("created_at")
+    if not created_at:
+        return
+    # Only a metric: a malformed timestamp must not stop the clip being dispatched
+    try:
+        waited = datetime.now(timezone.utc) - datetime.fromisoformat(created_at)
+    except (TypeError, ValueError) as e:
+        logger.debug("Skipping dispatch latency for clip %s: %s", clip.get("id"), e)
+        return
+    DISPATCH_LATENCY.observe(max(waited.total_seconds(), 0))
+
+
+def _install_signal_handlers(stop: threading.Event) -> None:
+    """
+    Turn SIGINT/SIGTERM into a stop request so in-flight clips can finish.
+    A second signal falls back to the default behaviour (immediate exit);
+    anything it interrupts is picked up again by requeue_stale_clips.
+    """
+    def handle(signum, frame):
+        logger.info("Received %s, finishing in-flight clips (repeat to force exit)", signal.Signals(signum).name)
+        stop.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, handle)
+        signal.signal(signal.SIGTERM, handle)
+
+
+def run_worker(interval: float = 1, max_interval: float = 60):
     """
     Run the background worker loop.
     
+    Polls again immediately while clips keep coming; each empty poll doubles
+    the wait, from interval up to max_interval.
+    
     Args:
-        interval: Seconds to wait between polling cycles
+        interval: Seconds to wait after the first empty poll
+        max_interval: Cap on the wait while the queue stays empty. With
+                      LISTEN/NOTIFY active a new clip ends the wait early,
+                      so this only bounds pickup of missed notifications
     """
-    print("[WORKER] Starting background worker...")
+    logger.info("Starting background worker...")
+    listener = None
+    next_listen_attempt = 0.0
+    listen_retry = LISTEN_RETRY_SECONDS
+    delay = interval
+    # Consecutive failed iterations; drives the error backoff
+    failures = 0
+    stop = threading.Event()
+    _install_signal_handlers(stop)
     
-    while True:
-        try:
-            supabase = get_supabase_client()
-            
-            # Fetch pending clips
-            result = supabase.table("audio_clips")\
-                .select("id")\
-                .eq("status", "pending")\
-                .order("created_at", desc=False)\
-                .limit(5)\
-                .execute()
-            
-            if result.data:
-                print(f"[WORKER] Found {len(result.data)} pending clips")
+    # process_clip is almost entirely network-bound (scrape, LLM, TTS,
+    # storage), so clips run side by side on a bounded pool
+    max_workers = get_settings().WORKER_CONCURRENCY
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clip")
+    # clip_id -> future for clips currently running; its size is how many
+    # pool slots are busy
+    inflight: dict[str, Future] = {}
+    INFLIGHT_CLIPS.set_function(lambda: len(inflight))
+    
+    metrics_port = get_settings().WORKER_METRICS_PORT
+    start_metrics_server(metrics_port)
+    
+    # One client (and HTTP/2 connection pool) for the life of the worker
+    supabase = get_supabase_client()
+    
+    stale_minutes = get_settings().WORKER_STALE_CLIP_MINUTES
+    _requeue_stale_clips(supabase, stale_minutes)
+    next_sweep = time.monotonic() + STALE_SWEEP_SECONDS
+    next_heartbeat = time.monotonic() + HEARTBEAT_SECONDS
+    
+    try:
+        while not stop.is_set():
+            # Clips claimed / handed to the pool this iteration; claimed ones
+            # that weren't submitted are released if the iteration fails
+            claimed = []
+            submitted = set()
+            try:
+                if listener is None and time.monotonic() >= next_listen_attempt:
+                    listener = _listen_connection()
+                    if listener is None:
+                        next_listen_attempt = time.monotonic() + listen_retry
+                        listen_retry = min(listen_retry * 2, LISTEN_RETRY_MAX_SECONDS)
+                    else:
+                        listen_retry = LISTEN_RETRY_SECONDS
                 
-                for clip in result.data:
-                    clip_id = clip["id"]
-                    print(f"[WORKER] Processing clip {clip_id}")
-                    process_clip(clip_id)
-            
-            # Wait before next poll
-            time.sleep(interval)
-            
-        except KeyboardInterrupt:
-            print("[WORKER] Shutting down gracefully...")
-            break
-        except Exception as e:
-            print(f"[ERROR] Worker error: {e}")
-            time.sleep(interval)
-
+                if time.monotonic() >= next_heartbeat:
+                    if inflight:
+                        _heartbeat(supabase, list(inflight))
+                    next_heartbeat = time.monotonic() + HEARTBEAT_SECONDS
+                
+                if time.monotonic() >= next_sweep:
+                    _requeue_stale_clips(supabase, stale_minutes)
+                    next_sweep = time.monotonic() + STALE_SWEEP_SECONDS
+                
+                # Pool is full; wait for a slot instead of fetching more work.
+                # Short timeout so a stop request isn't held up by long clips
+                if len(inflight) >= max_workers:
+                    wait(list(inflight.values()), timeout=1, return_when=FIRST_COMPLETED)
+                    continue
+                
+                # Claim only as many clips as there are free slots; claimed rows
+                # are already "processing", so other workers skip them
+                claimed = _claim_clips(supabase, max_workers - len(inflight), with_depth=bool(metrics_port))
+                
+                if failures:
+                    logger.info("Recovered after %d consecutive failures", failures)
+                    failures = 0
+                
+                if claimed:
+                    logger.info("Claimed %d pending clips", len(claimed))
+                    
+                    for clip in claimed:
+                        clip_id = clip["id"]
+                        logger.debug("Dispatching clip %s", clip_id)
+                        _observe_dispatch_latency(clip)
+                        # The claimed row carries the inputs, so process_clip
+                        # skips its own fetch and status update
+                        future = executor.submit(_process_clip_timed, clip_id, clip)
+                        inflight[clip_id] = future
+                        submitted.add(clip_id)
+                        future.add_done_callback(partial(_check_clip_result, supabase, clip_id))
+                        future.add_done_callback(lambda _, clip_id=clip_id: inflight.pop(clip_id, None))
+                    
+                    # More may be waiting; claim again right away
+                    delay = interval
+                    continue
+                
+                # Queue is empty: wait for a notification or back off. Jitter
+                # keeps replicas from polling in lockstep
+                listener = _wait_for_work(listener, delay + random.uniform(0, delay * 0.1), stop)
+                delay = min(delay * 2, max_interval)
+                
+            except Exception as e:
+                # Claimed rows are already "processing"; hand back any that
+                # didn't make it into the pool
+                if unsubmitted := [clip["id"] for clip in claimed if clip["id"] not in submitted]:
+                    _release_clips(supabase, unsubmitted)
+                failures += 1
+                POLL_ERRORS.inc()
+                # Back off from a failing dependency instead of retrying it
+                # at the poll rate; the next attempt after the wait acts as
+                # the probe
+                backoff = min(interval * 2 ** failures, max_interval)
+                if isinstance(e, httpx.TransportError):
+                    logger.warning("Supabase unreachable (%d in a row): %s", failures, e)
+                else:
+                    logger.exception("Worker error (%d in a row)", failures)
+                if failures == FAILURE_ALERT_THRESHOLD:
+                    logger.error(
+                        "Worker failing repeatedly; retrying every %gs until it recovers",
+                        max_interval
+                    )
+                stop.wait(backoff + random.uniform(0, backoff * 0.1))
+    finally:
+        # Claimed clips are already "processing"; let them finish rather
+        # than leave them for the stale-claim sweep
+        logger.info("Shutting down, waiting for %d in-flight clips...", len(inflight))
+        executor.shutdown(wait=True)
+        if listener is not None:
+            listener.close()
+        close_supabase_client()
+        logger.info("Worker stopped")
 
 if __name__ == "__main__":
+    setup_logging()
     run_worker()
 
 